@@ -0,0 +1,97 @@
+import re
+
+# Email / phone extraction shared by the ICP extractor (Option 1/4) and the
+# Option 2 contact-page lookup. Everything here runs in time linear in the
+# page text: emails are found by jumping from one "@" to the next and
+# matching a bounded local part / domain around it, instead of letting a
+# regex retry an unbounded local part from every character of a long token.
+EMAIL_LOCAL_MAX = 64
+EMAIL_DOMAIN_MAX = 253
+PHONE_MATCH_MAX = 64   # a 7-15 digit number with separators never needs more
+
+EMAIL_PATTERN = re.compile(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+")   # reference only, not linear
+# Candidate "@"s (followed by a dotted domain); the local part is read
+# backwards from each one and the domain forwards
+EMAIL_AT = re.compile(r"@(?=[a-zA-Z0-9-]{1,63}\.[a-zA-Z0-9-.])")
+EMAIL_LOCAL_REVERSED = re.compile(r"[a-zA-Z0-9_.+-]+")
+EMAIL_DOMAIN = re.compile(r"[a-zA-Z0-9-]{1,63}\.[a-zA-Z0-9-.]{1,%d}" % (EMAIL_DOMAIN_MAX - 64))
+# "name [at] domain [dot] com", "name(at)domain(dot)com", "name {@} domain.com" ...
+# Patterns start with a character class, not an optional part, so the
+# regex engine can skip ahead to candidate characters instead of trying every position
+OBFUSCATED_AT = re.compile(r"[\[({<][ \t]{0,3}(?:at|@)[ \t]{0,3}[\])}>]", re.IGNORECASE)
+OBFUSCATED_DOT = re.compile(r"[\[({<][ \t]{0,3}(?:dot|\.)[ \t]{0,3}[\])}>]", re.IGNORECASE)
+
+# Old forms: \+?\d[\d\s\-().]{7,} and \+?\d[\d -]{7,}\d. The leading "+" is
+# now picked up from the character before the match (_with_plus); the
+# trailing \d forces backtracking over the separator run, so that
+# quantifier is bounded.
+PHONE_PATTERN = re.compile(r"\d[\d\s\-().]{7,}")
+CONTACT_PHONE_PATTERN = re.compile(r"\d[\d -]{7,30}\d")
+NON_PHONE_CHARS = re.compile(r"[^\d+]")
+
+
+def _with_plus(text, match):
+    start = match.start()
+    return text[start - 1:match.end()] if start and text[start - 1] == "+" else match.group()
+
+
+def _join_around(pattern, replacement, text):
+    """ pattern.sub(replacement, text), also dropping the spaces/tabs next to each match """
+    pieces = pattern.split(text)
+    if len(pieces) == 1:
+        return text
+    last = len(pieces) - 1
+    return replacement.join(piece.rstrip(" \t") if i == 0 else
+                            piece.lstrip(" \t") if i == last else piece.strip(" \t")
+                            for i, piece in enumerate(pieces))
+
+
+def deobfuscate(text):
+    """ Rewrite "name [at] domain [dot] com" style addresses into plain ones """
+    if not OBFUSCATED_AT.search(text):
+        return text
+    return _join_around(OBFUSCATED_DOT, ".", _join_around(OBFUSCATED_AT, "@", text))
+
+
+def iter_emails(text):
+    """ Email addresses in text, in order, with the same matches as EMAIL_PATTERN.finditer """
+    last_end = pos = 0
+    while True:
+        candidate = EMAIL_AT.search(text, pos)
+        if candidate is None:
+            return
+        at = candidate.start()
+        local = EMAIL_LOCAL_REVERSED.match(text[max(last_end, at - EMAIL_LOCAL_MAX):at][::-1])
+        if local:
+            last_end = pos = EMAIL_DOMAIN.match(text, at + 1).end()
+            yield text[at - local.end():last_end]
+        else:
+            pos = at + 1
+
+
+def find_emails(text):
+    """ Unique addresses in page order, obfuscated ones included """
+    return list(dict.fromkeys(iter_emails(deobfuscate(text))))
+
+
+def find_phones(text, extra=()):
+    """ Unique phone numbers (digits and +, 7-15 long) from text and e.g. tel: links """
+    phones = []
+    found = [_with_plus(text, match) for match in PHONE_PATTERN.finditer(text)]
+    for phone in found + list(extra):
+        phone = phone.rstrip()
+        if len(phone) > PHONE_MATCH_MAX:
+            continue
+        clean = NON_PHONE_CHARS.sub("", phone)
+        if 7 <= len(clean) <= 15:
+            phones.append(clean)
+    return list(dict.fromkeys(phones))
+
+
+def first_email(text):
+    return next(iter_emails(deobfuscate(text)), "")
+
+
+def first_phone(text):
+    match = CONTACT_PHONE_PATTERN.search(text)
+    return _with_plus(text, match) if match else ""
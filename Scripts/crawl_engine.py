@@ -0,0 +1,121 @@
+import threading
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urlparse
+from rich.console import Console
+from rich.live import Live
+from rich.text import Text
+
+# Defaults for the crawl engine (Option 4). Most of a fetch is network wait,
+# so the global limit can be well above the core count.
+CRAWL_MAX_WORKERS = 32
+CRAWL_PER_HOST = 2
+CRAWL_REFRESH_SECONDS = 0.5
+
+
+def host_key(domain):
+    """ Normalise a domain/URL to the host used for per-host limits """
+    domain = domain.strip().lower()
+    host = urlparse(domain if "://" in domain else f"//{domain}").hostname or domain
+    return host[4:] if host.startswith("www.") else host
+
+
+class CrawlStats:
+    """ Thread-safe counters behind the live throughput readout """
+
+    def __init__(self, total):
+        self.total = total
+        self.done = 0
+        self.failed = 0
+        self.in_flight = 0
+        self.started_at = time.monotonic()
+        self._lock = threading.Lock()
+
+    def task_started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def task_finished(self, ok):
+        with self._lock:
+            self.in_flight -= 1
+            self.done += 1
+            if not ok:
+                self.failed += 1
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started_at
+        return self.done / elapsed if elapsed > 0 else 0.0
+
+    def render(self):
+        return Text.from_markup(
+            f"[bold cyan]Crawled {self.done}/{self.total}[/bold cyan]  "
+            f"[green]{self.rate():.2f} domains/sec[/green]  "
+            f"[yellow]in-flight: {self.in_flight}[/yellow]  "
+            f"[red]failures: {self.failed}[/red]"
+        )
+
+
+class CrawlEngine:
+    """
+    Bounded worker pool that runs `worker(domain)` for every domain with a
+    global concurrency limit and a per-host limit, yielding results as they finish.
+    """
+
+    def __init__(self, worker, max_workers=CRAWL_MAX_WORKERS, per_host=CRAWL_PER_HOST, console=None):
+        self.worker = worker
+        self.max_workers = max(1, max_workers)
+        self.per_host = max(1, per_host)
+        self.console = console or Console()
+        self.stats = None
+
+    def _call(self, domain):
+        self.stats.task_started()
+        try:
+            rows = self.worker(domain)
+        except Exception as e:
+            self.console.print(f"[red] Error scraping {domain}: {e}[/red]")
+            rows = []
+        self.stats.task_finished(bool(rows))
+        return rows
+
+    def run(self, domains):
+        """ Yield (domain, rows) tuples in completion order """
+        domains = list(domains)
+        self.stats = CrawlStats(len(domains))
+        pending = deque(domains)
+        deferred = defaultdict(deque)   # host -> domains waiting for a per-host slot
+        active_per_host = defaultdict(int)
+        futures = {}
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor, \
+                Live(self.stats.render(), console=self.console, refresh_per_second=4, transient=False) as live:
+
+            def submit(domain, host):
+                active_per_host[host] += 1
+                futures[executor.submit(self._call, domain)] = (domain, host)
+
+            def fill():
+                while pending and len(futures) < self.max_workers:
+                    domain = pending.popleft()
+                    host = host_key(domain)
+                    if active_per_host[host] >= self.per_host:
+                        deferred[host].append(domain)
+                    else:
+                        submit(domain, host)
+
+            fill()
+            while futures:
+                finished, _ = wait(futures, timeout=CRAWL_REFRESH_SECONDS, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    domain, host = futures.pop(future)
+                    active_per_host[host] -= 1
+                    if deferred[host]:
+                        submit(deferred[host].popleft(), host)
+                    elif not active_per_host[host]:
+                        del active_per_host[host]
+                        del deferred[host]
+                    yield domain, future.result()
+                fill()
+                live.update(self.stats.render())
+            live.update(self.stats.render())
@@ -0,0 +1,102 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+# Append-only crawl journal for Option 4. One JSON line per finished domain
+# ({"d": domain, "s": "ok" | "failed", "rows": [...]}) so an interrupted
+# crawl of a large domain list can resume where it stopped. Once the rows
+# are exported the journal is retired (finish()), so the next crawl of the
+# same list starts fresh instead of offering to resume a finished one.
+JOURNAL_FOLDER = os.path.join("output", "journals")
+FSYNC_EVERY = 100
+
+
+def journal_path(domain_file, folder=JOURNAL_FOLDER):
+    """ One journal per domain list file """
+    source = os.path.abspath(domain_file)
+    digest = hashlib.sha1(source.encode("utf-8")).hexdigest()[:10]
+    name = os.path.splitext(os.path.basename(source))[0]
+    return os.path.join(folder, f"{name}-{digest}.jsonl")
+
+
+class CrawlJournal:
+    def __init__(self, path):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = None
+        self._writes = 0
+        self._lock = threading.Lock()
+
+    def exists(self):
+        return os.path.exists(self.path) and os.path.getsize(self.path) > 0
+
+    def _retire(self, suffix):
+        self.close()
+        if self.exists():
+            os.replace(self.path, f"{self.path}.{int(time.time())}.{suffix}")
+
+    def reset(self):
+        """ Start over: keep the old journal next to the new one """
+        self._retire("old")
+
+    def finish(self):
+        """ The crawl is done and exported: move the journal aside so it is not resumed """
+        self._retire("done")
+
+    def _records(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    yield json.loads(line)
+                except ValueError:
+                    # A crash mid-write can leave a torn last line
+                    continue
+
+    def status(self):
+        """ Latest status per domain: {domain: "ok" | "failed"} """
+        return {record["d"]: record["s"] for record in self._records()}
+
+    def pending(self, domains):
+        """ Domains that are not done yet (never tried or failed last time) """
+        done = {d for d, s in self.status().items() if s == "ok"}
+        return [d for d in domains if d not in done]
+
+    def _ends_with_newline(self):
+        with open(self.path, "rb") as f:
+            f.seek(-1, os.SEEK_END)
+            return f.read(1) == b"\n"
+
+    def record(self, domain, rows):
+        line = json.dumps({"d": domain, "s": "ok" if rows else "failed", "rows": rows},
+                          ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            if self._file is None:
+                torn = self.exists() and not self._ends_with_newline()
+                self._file = open(self.path, "a", encoding="utf-8")
+                if torn:
+                    self._file.write("\n")
+            self._file.write(line + "\n")
+            self._file.flush()
+            self._writes += 1
+            if self._writes % FSYNC_EVERY == 0:
+                os.fsync(self._file.fileno())
+
+    def rows(self):
+        """ Every extracted row, once per domain, in one pass over the journal """
+        seen = set()
+        for record in self._records():
+            if record["s"] == "ok" and record["d"] not in seen:
+                seen.add(record["d"])
+                yield from record["rows"]
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+                os.fsync(self._file.fileno())
+                self._file.close()
+                self._file = None
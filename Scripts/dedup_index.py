@@ -0,0 +1,151 @@
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+from urllib.parse import urlparse
+
+# Cross-run dedup index of domains, URLs and emails the scraper has already
+# seen. A Bloom filter held in a fixed memory budget answers "definitely
+# new" without touching disk; only Bloom hits are confirmed against the
+# exact key set in SQLite, so known targets are skipped before any network I/O.
+DEDUP_FOLDER = os.path.join("output", "dedup")
+DEDUP_BLOOM_BYTES = 64 * 1024 * 1024   # ~0.6% false positives at 50M keys
+DEDUP_HASHES = 7
+
+
+def normalize_domain(value):
+    value = value.strip().lower()
+    host = urlparse(value if "://" in value else f"//{value}").hostname or value
+    return host[4:] if host.startswith("www.") else host
+
+
+def normalize_url(value):
+    """ Scheme-less, www-less, lowercased host + path without trailing slash (+ query) """
+    value = value.strip()
+    parsed = urlparse(value if "://" in value else f"//{value}")
+    url = normalize_domain(parsed.netloc) + parsed.path.rstrip("/")
+    return f"{url}?{parsed.query}" if parsed.query else url
+
+
+def normalize_email(value):
+    return value.strip().lower()
+
+
+class BloomFilter:
+    def __init__(self, size_bytes=DEDUP_BLOOM_BYTES, hashes=DEDUP_HASHES, bits=None):
+        self.bits = bits if bits is not None else bytearray(size_bytes)
+        self.size = len(self.bits) * 8
+        self.hashes = hashes
+
+    def _positions(self, key):
+        digest = hashlib.blake2b(key.encode("utf-8"), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], "little")
+        h2 = int.from_bytes(digest[8:], "little") | 1
+        return [(h1 + i * h2) % self.size for i in range(self.hashes)]
+
+    def add(self, key):
+        for pos in self._positions(key):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+
+    def __contains__(self, key):
+        return all(self.bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(key))
+
+    def estimated_false_positive_rate(self, count):
+        return (1 - math.exp(-self.hashes * count / self.size)) ** self.hashes
+
+
+class DedupStats:
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.lookups = 0
+        self.bloom_negatives = 0
+        self.hits = 0
+        self.false_positives = 0
+
+    def summary(self):
+        return (f"Dedup index: {self.lookups} lookups, {self.hits} already known (skipped), "
+                f"{self.bloom_negatives} cleared by the Bloom filter alone, "
+                f"{self.false_positives} Bloom false positives")
+
+
+class DedupIndex:
+    def __init__(self, folder=DEDUP_FOLDER, bloom_bytes=DEDUP_BLOOM_BYTES):
+        os.makedirs(folder, exist_ok=True)
+        self.stats = DedupStats()
+        self._lock = threading.Lock()
+        self._bloom_path = os.path.join(folder, "keys.bloom")
+        self._db = sqlite3.connect(os.path.join(folder, "keys.sqlite"), check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("CREATE TABLE IF NOT EXISTS keys (key TEXT PRIMARY KEY) WITHOUT ROWID")
+        self._db.commit()
+        self.count = self._db.execute("SELECT COUNT(*) FROM keys").fetchone()[0]
+        self.bloom = self._load_bloom(bloom_bytes)
+
+    def _load_bloom(self, bloom_bytes):
+        """ Reuse the saved filter if it matches the exact set, otherwise rebuild it from SQLite """
+        if os.path.exists(self._bloom_path) and os.path.getsize(self._bloom_path) == bloom_bytes + 8:
+            with open(self._bloom_path, "rb") as f:
+                saved_count = int.from_bytes(f.read(8), "little")
+                if saved_count == self.count:
+                    return BloomFilter(bits=bytearray(f.read()))
+        bloom = BloomFilter(bloom_bytes)
+        for (key,) in self._db.execute("SELECT key FROM keys"):
+            bloom.add(key)
+        return bloom
+
+    def _contains(self, key):
+        self.stats.lookups += 1
+        if key not in self.bloom:
+            self.stats.bloom_negatives += 1
+            return False
+        found = self._db.execute("SELECT 1 FROM keys WHERE key = ?", (key,)).fetchone() is not None
+        if found:
+            self.stats.hits += 1
+        else:
+            self.stats.false_positives += 1
+        return found
+
+    def _add(self, keys):
+        keys = [key for key in keys if key]
+        if not keys:
+            return
+        before = self._db.total_changes
+        self._db.executemany("INSERT OR IGNORE INTO keys VALUES (?)", [(key,) for key in keys])
+        self._db.commit()
+        self.count += self._db.total_changes - before
+        for key in keys:
+            self.bloom.add(key)
+
+    # ---------- public API ----------
+    def seen_domain(self, domain):
+        with self._lock:
+            return self._contains("d:" + normalize_domain(domain))
+
+    def seen_url(self, url):
+        with self._lock:
+            return self._contains("u:" + normalize_url(url))
+
+    def seen_email(self, email):
+        with self._lock:
+            return self._contains("e:" + normalize_email(email))
+
+    def add(self, domains=(), urls=(), emails=()):
+        keys = (["d:" + normalize_domain(d) for d in domains if d]
+                + ["u:" + normalize_url(u) for u in urls if u]
+                + ["e:" + normalize_email(e) for e in emails if e])
+        with self._lock:
+            self._add(keys)
+
+    def close(self):
+        """ Save the Bloom filter next to the exact set so the next run starts warm """
+        with self._lock:
+            tmp_path = f"{self._bloom_path}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(self.count.to_bytes(8, "little"))
+                f.write(self.bloom.bits)
+            os.replace(tmp_path, self._bloom_path)
+            self._db.close()
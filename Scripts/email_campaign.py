@@ -1,16 +1,25 @@
-import smtplib
-import pandas as pd
+import gzip
+import json
 import os
-import time
+import smtplib
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
 from rich.console import Console
 from rich.prompt import Prompt
 from rich.panel import Panel
 from datetime import datetime
+from lead_store import LeadStore
+from smtp_pool import SMTP_POOL_SIZE, SMTPPool
+from send_pipeline import SEND_DAILY_LIMIT, SEND_RATE, SendLimiter, SendPipeline
+from outbox import Outbox, campaign_id
+from email_templates import compile_template, iter_chunks, present, recipient_names
 
 console = Console()
 
+# Leads are read, rendered and exported this many at a time, so memory stays flat however many there are
+EMAIL_CHUNK_ROWS = 10_000
+EXPORT_COMPRESSLEVEL = 6
+
 # -------------------- Step 1: Define Email Templates --------------------
 
 # Template 1: Formal Email
@@ -64,102 +73,123 @@ def get_template_choice():
         console.print("[bold red]Invalid choice, defaulting to Formal Template.[/bold red]")
         return formal_template
 
-# -------------------- Step 4: Read Data from All Excel Files --------------------
+# -------------------- Step 4: Read Leads from the Lead Store --------------------
 
-def read_all_excel_files():
-    """ Read and combine data from all Excel files in the output folder """
-    output_folder = os.path.join(os.getcwd(), "output")
-    all_files = [f for f in os.listdir(output_folder) if f.endswith('.xlsx')]
-    
-    data_frames = []
-    for file in all_files:
-        file_path = os.path.join(output_folder, file)
-        df = pd.read_excel(file_path)
-        data_frames.append(df)
-    
-    # Combine all data into one DataFrame
-    combined_data = pd.concat(data_frames, ignore_index=True)
-    return combined_data
+def read_leads(store):
+    """ Leads with an email that have not been contacted yet, from the lead store """
+    if store.count() == 0:
+        # First run after upgrading: pull in the workbooks the scraper wrote before the store existed
+        imported = store.import_workbooks(os.path.join(os.getcwd(), "output"))
+        console.print(f"[cyan]Imported {imported} leads from existing Excel files into the lead store[/cyan]")
+    return store.iter_leads_to_contact(EMAIL_CHUNK_ROWS)
 
 # -------------------- Step 5: Generate Emails --------------------
 
-def generate_email_template(data, template, your_name, your_position, your_company):
-    """ Create personalized emails for each recipient from the data """
-    emails = []
-    valid_email_count = 0
-    invalid_email_count = 0
-
-    for index, row in data.iterrows():
-        recipient_name = row['Contact Person'] if row['Contact Person'] else "Dear Sir/Mam"
-        company_name = row['Company Name']
-        contact_email = row['Contact Email']
-
-        # Skip if the email is missing or invalid
-        if not contact_email or pd.isnull(contact_email):
-            invalid_email_count += 1
-            continue
-
-        valid_email_count += 1
-        # Replace placeholders with actual data
-        email_body = template.format(
-            recipient_name=recipient_name,
-            company_name=company_name,
-            contact_email=contact_email,
-            your_name=your_name,
-            your_position=your_position,
-            your_company=your_company
-        )
-        emails.append({
-            'email_body': email_body,
-            'company_name': company_name,
-            'recipient_email': contact_email
-        })
-
-    return emails, valid_email_count, invalid_email_count
+def generate_email_template(data, template, your_name, your_position, your_company, counts=None):
+    """
+    Yield a personalized email for each recipient, rendered EMAIL_CHUNK_ROWS
+    leads at a time. data is a DataFrame or an iterable of DataFrame chunks;
+    valid/invalid tallies are added to `counts` as the chunks are consumed.
+    """
+    counts = {'valid': 0, 'invalid': 0} if counts is None else counts
+    # The sender's details are the same in every email; only the recipient columns are filled in per row
+    compiled = compile_template(template).bind(your_name=your_name, your_position=your_position,
+                                               your_company=your_company)
+    for chunk in iter_chunks(data, EMAIL_CHUNK_ROWS):
+        # Skip rows where the email is missing or invalid
+        valid = present(chunk['Contact Email'])
+        valid_count = int(valid.sum())
+        counts['valid'] += valid_count
+        counts['invalid'] += len(chunk) - valid_count
+        chunk = chunk[valid]
+
+        bodies = compiled.render(recipient_name=recipient_names(chunk), company_name=chunk['Company Name'],
+                                 contact_email=chunk['Contact Email'])
+        for body, company_name, contact_email in zip(bodies, chunk['Company Name'].tolist(),
+                                                     chunk['Contact Email'].tolist()):
+            yield {'email_body': body, 'company_name': company_name, 'recipient_email': contact_email}
+
+def export_emails(emails, file_path):
+    """ Yield emails unchanged while writing them, one JSON object per line, to a gzip file """
+    with gzip.open(file_path, "wt", encoding="utf-8", compresslevel=EXPORT_COMPRESSLEVEL) as f:
+        for email in emails:
+            f.write(json.dumps(email, ensure_ascii=False, default=str) + "\n")
+            yield email
 
 # -------------------- Step 6: Send Email --------------------
 
-def send_email(subject, email_body, recipient_email, sender_email, sender_password):
-    """ Send an email with the given subject and body """
+def send_email(pool, subject, email_body, recipient_email, sender_email):
+    """ Send an email with the given subject and body over a pooled SMTP connection; errors are raised """
+    msg = MIMEMultipart()
+    msg['From'] = sender_email
+    msg['To'] = recipient_email
+    msg['Subject'] = subject
+    msg.attach(MIMEText(email_body, 'html'))
+
+    pool.send(msg, sender_email, [recipient_email])
+
+# Function to send the campaign's queued outbox messages through the rate-limited pipeline
+def send_bulk_emails(outbox, campaign, sender_email, sender_password, lead_store=None, pool_size=SMTP_POOL_SIZE,
+                     rate=SEND_RATE, daily_limit=SEND_DAILY_LIMIT):
+    """
+    Send what is still queued for `campaign` over pool_size reused SMTP
+    connections at up to `rate` messages/sec and `daily_limit` messages/day,
+    with a live sent/failed/queued readout. Every message is marked sending
+    before it goes out and sent / failed after, so a rerun after a crash
+    only sends what is left. Leads are marked contacted in batches.
+    """
+    interrupted = outbox.recover(campaign)
+    if interrupted:
+        console.print(f"[yellow]{interrupted} emails were mid-send when the last run stopped; "
+                      f"they are marked failed, not resent[/yellow]")
+    if not outbox.counts(campaign)['queued']:
+        console.print("[yellow]Nothing is queued for this campaign[/yellow]")
+        return
+
+    def send(email):
+        outbox.mark_sending(email)
+        subject = f"Hi {email['company_name']}, Here's a message from {sender_email}"
+        send_email(pool, subject, email['email_body'], email['recipient_email'], sender_email)
+
+    def sink(sent):
+        outbox.mark_sent(sent)
+        if lead_store is not None:
+            lead_store.mark_contacted([email['recipient_email'] for email in sent])
+
+    limiter = SendLimiter(sender_email, rate=rate, daily_limit=daily_limit)
     try:
-        msg = MIMEMultipart()
-        msg['From'] = sender_email
-        msg['To'] = recipient_email
-        msg['Subject'] = subject
-        msg.attach(MIMEText(email_body, 'html'))
-
-        # Establish connection to SMTP server (Gmail in this case)
-        server = smtplib.SMTP('smtp.gmail.com', 587)
-        server.starttls()
-        server.login(sender_email, sender_password)
-        server.sendmail(sender_email, recipient_email, msg.as_string())
-        server.quit()
-        return True
-    except Exception as e:
-        console.print(f"[red]Error sending email to {recipient_email}: {e}[/red]")
-        return False
-
-# Function to send bulk emails in batches
-def send_bulk_emails(emails, sender_email, sender_password, batch_size=10, delay=3):
-    total_sent = 0
-    total_failed = 0
-
-    for i in range(0, len(emails), batch_size):
-        batch = emails[i:i + batch_size]
-        for email in batch:
-            subject = f"Hi {email['company_name']}, Here's a message from {sender_email}"
-            sent = send_email(subject, email['email_body'], email['recipient_email'], sender_email, sender_password)
-            if sent:
-                total_sent += 1
-            else:
-                total_failed += 1
-
-        # Introduce delay between batches
-        time.sleep(delay)
-
-    # Summary of sent and failed emails
-    console.print(f"\n[bold green]Total emails sent: {total_sent}[/bold green]")
-    console.print(f"[bold red]Total emails failed: {total_failed}[/bold red]")
+        # Entering the pool logs in once, so bad credentials stop the run before any message is taken
+        with SMTPPool(sender_email, sender_password, size=pool_size) as pool:
+            pipeline = SendPipeline(send, limiter, sink, workers=pool.size, console=console,
+                                    on_failed=outbox.mark_failed, on_unsent=outbox.mark_queued)
+            pipeline.run(outbox.pending(campaign))
+    except (smtplib.SMTPException, OSError) as e:
+        console.print(f"[bold red]Could not connect or log in to the mail server: {e}[/bold red]")
+        console.print(f"[yellow]Nothing was sent. {outbox.summary(campaign)}[/yellow]")
+        return
+    finally:
+        limiter.close()
+    console.print(f"[cyan]{pool.stats.summary()}[/cyan]")
+    console.print(f"[cyan]{outbox.summary(campaign)}[/cyan]")
+
+def offer_requeue(outbox, campaign):
+    """ List why earlier sends failed and queue the chosen ones again """
+    failed = outbox.failed_errors(campaign)
+    if not failed:
+        return 0
+    console.print(f"[yellow]{sum(count for _, count in failed)} emails of this campaign failed in earlier runs:[/yellow]")
+    for number, (error, count) in enumerate(failed, 1):
+        console.print(f"  {number}. {count} x {error}")
+    answer = Prompt.ask("[bold green]Requeue which? Numbers separated by commas, 'all', or Enter for none[/bold green]",
+                        default="").strip().lower()
+    if answer == "all":
+        requeued = outbox.requeue(campaign)
+    else:
+        chosen = {int(part) for part in answer.split(",") if part.strip().isdigit()}
+        requeued = outbox.requeue(campaign, [error for number, (error, _) in enumerate(failed, 1) if number in chosen])
+    if requeued:
+        console.print(f"[cyan]{requeued} emails queued again[/cyan]")
+    return requeued
 
 # -------------------- Step 7: Main Program --------------------
 
@@ -169,31 +199,35 @@ def main():
     # Gather sender's details
     your_name, your_position, your_company = get_sender_details()
     
-    # Read data from all Excel files in the output folder
-    data = read_all_excel_files()
+    # Read leads that have an email and were not contacted yet from the lead store
+    lead_store = LeadStore(os.path.join(os.getcwd(), "output", "leads.sqlite"))
+    data = read_leads(lead_store)
     
     # Get the user's chosen email template
     template_choice = get_template_choice()
     
-    # Generate personalized emails
-    emails, valid_email_count, invalid_email_count = generate_email_template(
-        data, template_choice, your_name, your_position, your_company
-    )
-    
-    # Display summary of valid/invalid emails
-    console.print(f"\n[bold green]Valid emails to be sent: {valid_email_count}[/bold green]")
-    console.print(f"[bold red]Invalid emails (missing or invalid): {invalid_email_count}[/bold red]")
+    # Generate personalized emails (lazily, a chunk of leads at a time)
+    counts = {'valid': 0, 'invalid': 0}
+    emails = generate_email_template(data, template_choice, your_name, your_position, your_company, counts)
     
-    # Save the generated emails to an Excel file
+    # Save the generated emails to a compressed JSON Lines file
     output_folder = os.path.join(os.getcwd(), "output", f"Generated_Emails_{datetime.now().strftime('%Y_%m_%d')}")
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
+    file_path = os.path.join(output_folder, "Generated_Emails.jsonl.gz")
 
-    file_path = os.path.join(output_folder, "Generated_Emails.xlsx")
-    email_df = pd.DataFrame(emails)
-    email_df.to_excel(file_path, index=False)
+    # Export and queue them in the outbox in one pass; a campaign that was already queued only gains the new recipients
+    outbox = Outbox(os.path.join(os.getcwd(), "output", "outbox.sqlite"))
+    campaign = campaign_id(template_choice, your_name, your_position, your_company)
+    added = outbox.enqueue(campaign, export_emails(emails, file_path))
 
+    # Display summary of valid/invalid emails
+    console.print(f"\n[bold green]Valid emails to be sent: {counts['valid']}[/bold green]")
+    # The store only hands over leads with an email; the ones without are counted there
+    invalid = counts['invalid'] + lead_store.count_without_email()
+    console.print(f"[bold red]Invalid emails (missing or invalid): {invalid}[/bold red]")
     console.print(f"\n[bold cyan]Emails saved to {file_path}[/bold cyan]")
+    console.print(f"[cyan]{added} new emails queued for campaign {campaign}. {outbox.summary(campaign)}[/cyan]")
 
     # Ask the user to send the emails
     send_choice = Prompt.ask("[bold green]Do you want to send the emails? (y/n)[/bold green]")
@@ -201,9 +235,16 @@ def main():
     if send_choice.lower() == 'y':
         sender_email = Prompt.ask("[bold green]Enter your email address (sender):[/bold green]")
         sender_password = Prompt.ask("[bold green]Enter your email password:[/bold green]")
+        pool_size = Prompt.ask("[bold green]How many SMTP connections to send over?[/bold green]",
+                               default=str(SMTP_POOL_SIZE))
+        daily_limit = Prompt.ask("[bold green]Daily sending limit of this account?[/bold green]",
+                                 default=str(SEND_DAILY_LIMIT))
+        offer_requeue(outbox, campaign)
         
-        # Send emails in batches
-        send_bulk_emails(emails, sender_email, sender_password)
+        # Send emails over a pool of reused SMTP connections, rate limited
+        send_bulk_emails(outbox, campaign, sender_email, sender_password, lead_store=lead_store,
+                         pool_size=int(pool_size) if pool_size.isdigit() else SMTP_POOL_SIZE,
+                         daily_limit=int(daily_limit) if daily_limit.isdigit() else SEND_DAILY_LIMIT)
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,100 @@
+import functools
+from string import Formatter
+
+# Compiled email templates for the campaign (email_campaign.py, test.py).
+# A template is split once into static text and {field} slots. Fields that
+# are the same for every email (the sender's details) are folded into the
+# static text with bind(), and what is left is rendered column-wise: each
+# body is one join of the static pieces with that row's values, instead of
+# a str.format() call that re-parses the template for each DataFrame row.
+FALLBACK_RECIPIENT_NAME = "Dear Sir/Mam"
+
+
+class CompiledTemplate:
+    def __init__(self, segments):
+        # [(literal text, field name or None, format spec), ...]
+        self.segments = segments
+        self.fields = list(dict.fromkeys(field for _, field, _ in segments if field is not None))
+        self._slots = [(field, spec) for _, field, spec in segments if field is not None]
+        # static text between the slots: len(self._slots) + 1 pieces
+        self._static = [literal for literal, _, _ in segments] + [""] * (len(segments) == len(self._slots))
+
+    @classmethod
+    def parse(cls, template):
+        segments = []
+        for literal, field, spec, conversion in Formatter().parse(template):
+            if field is not None and (not field or conversion or not field.isidentifier()):
+                raise ValueError(f"unsupported template field {{{field}}}: only plain {{name}} fields are")
+            segments.append((literal, field, spec or ""))
+        return cls(segments)
+
+    def bind(self, **values):
+        """ Fold fields that are the same for every email into the static text """
+        segments, literal = [], ""
+        for text, field, spec in self.segments:
+            literal += text
+            if field in values:
+                literal += format(values[field], spec)
+            elif field is not None:
+                segments.append((literal, field, spec))
+                literal = ""
+        segments.append((literal, None, ""))
+        return CompiledTemplate(segments)
+
+    def render(self, **columns):
+        """
+        One body per row, from equal-length columns (lists, Series, arrays)
+        for every field that is not bound; values are formatted as
+        str.format() would.
+        """
+        missing = [field for field in self.fields if field not in columns]
+        if missing:
+            raise KeyError(f"no column for template fields: {', '.join(missing)}")
+        if not self._slots:
+            return ["".join(self._static)] * len(next(iter(columns.values()), []))
+        texts = {slot: _as_text(columns[slot[0]], slot[1]) for slot in set(self._slots)}
+        parts = [""] * (2 * len(self._slots) + 1)
+        parts[0::2] = self._static
+        bodies = []
+        for row in zip(*(texts[slot] for slot in self._slots)):
+            parts[1::2] = row
+            bodies.append("".join(parts))
+        return bodies
+
+
+def _as_text(column, spec):
+    values = column.tolist() if hasattr(column, "tolist") else list(column)
+    if spec:
+        return [format(value, spec) for value in values]
+    if all(type(value) is str for value in values):
+        return values
+    return [str(value) for value in values]
+
+
+@functools.lru_cache(maxsize=16)
+def compile_template(template):
+    """ Parse a template once; later calls with the same text reuse it """
+    return CompiledTemplate.parse(template)
+
+
+def iter_chunks(data, chunk_rows):
+    """ Slices of chunk_rows rows from a DataFrame; an iterable of DataFrame chunks is passed through """
+    if hasattr(data, "iloc"):
+        for start in range(0, len(data), chunk_rows):
+            yield data.iloc[start:start + chunk_rows]
+    else:
+        yield from data
+
+
+def present(column):
+    """ Mask of rows that have a value: not null and not an empty string """
+    return column.notna() & column.ne("")
+
+
+def with_fallback(column, fallback):
+    """ The column, with fallback wherever it is null or empty """
+    return column.where(present(column), fallback)
+
+
+def recipient_names(data):
+    return with_fallback(data['Contact Person'], FALLBACK_RECIPIENT_NAME)
@@ -0,0 +1,33 @@
+from worker_stage import WorkerStage
+
+# Enrichment stage for Option 2. Search results are pushed into a bounded
+# queue and a separate pool of workers fetches each result's page, so the
+# search threads never wait on contact-info fetches and a slow enrichment
+# side blocks the producer instead of growing memory (backpressure).
+ENRICH_WORKERS = 16
+ENRICH_QUEUE_SIZE = 64
+ENRICH_FLUSH_EVERY = 25
+
+
+def describe_result(result):
+    """ A search result by its link """
+    if isinstance(result, dict) and result.get("link"):
+        return result["link"]
+    return str(result)[:120]
+
+
+class EnrichmentStage(WorkerStage):
+    """
+    WorkerStage for leads: workers run `enrich(result)` and the finished
+    leads go to `sink(leads)` in batches; close() returns them (all of them
+    unless keep_leads=False). Failures are counted in `failed` / `unsaved`.
+    """
+
+    def __init__(self, enrich, sink, workers=ENRICH_WORKERS, queue_size=ENRICH_QUEUE_SIZE,
+                 flush_every=ENRICH_FLUSH_EVERY, keep_leads=True, console=None):
+        super().__init__(enrich, sink, workers=workers, queue_size=queue_size, flush_every=flush_every,
+                         keep_results=keep_leads, console=console, name="Enrichment", describe=describe_result)
+
+    @property
+    def leads(self):
+        return self.results
@@ -0,0 +1,223 @@
+import re
+from urllib.parse import urljoin
+from bs4 import CData, NavigableString, Tag
+from contact_patterns import find_emails, find_phones, first_email, first_phone
+from html_parsing import parse_html
+
+# Bump whenever a change here alters the rows, so pages stored by
+# page_fingerprints are extracted again instead of reused
+EXTRACTOR_VERSION = 1
+
+INDUSTRY_KEYWORDS = [
+    "software", "ai", "artificial intelligence", "cloud", "data", "e-learning", "cybersecurity",
+    "healthcare", "fintech", "education", "devops", "iot", "blockchain", "logistics", "consulting"
+]
+TECH_SIGNATURES = ["wordpress", "shopify", "react", "vue", "django", "laravel", "jquery", "bootstrap"]
+ADDRESS_WORDS = ['address', 'location', 'hq', 'head office']
+PARTNER_MARKERS = ['.gov', '.org', '.edu', 'partner', 'ngo', 'ministry']
+SOCIAL_HOSTS = [
+    ("linkedin.com", "LinkedIn"), ("twitter.com", "Twitter"), ("facebook.com", "Facebook"),
+    ("instagram.com", "Instagram"), ("youtube.com", "YouTube"),
+]
+# Site crawl merge: these columns collect values from every page, the rest keep the first real value
+MERGED_LIST_FIELDS = ("Emails", "Phones", "WhatsApp", "Gov / Partner Links")
+MISSING_VALUES = ("N/A", "Unknown", "")
+
+NAME_PATTERN = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b")
+
+
+class KeywordMatcher:
+    """
+    Matches a fixed, ordered keyword list against already-lowercased text.
+    Built once at import; each haystack is lowercased once by the caller and
+    probed with C-level substring search, which beats a regex alternation
+    scan in CPython for short keyword lists like ours.
+    """
+
+    def __init__(self, keywords):
+        self.keywords = [k.lower() for k in keywords]
+
+    def first(self, *haystacks):
+        """ First keyword (in list order) found in any haystack, or None """
+        for keyword in self.keywords:
+            for haystack in haystacks:
+                if keyword in haystack:
+                    return keyword
+        return None
+
+    def all(self, haystack):
+        return [keyword for keyword in self.keywords if keyword in haystack]
+
+
+INDUSTRY_MATCHER = KeywordMatcher(INDUSTRY_KEYWORDS)
+TECH_MATCHER = KeywordMatcher(TECH_SIGNATURES)
+
+
+def _unique(items):
+    return list(dict.fromkeys(items))
+
+
+def walk_document(soup):
+    """
+    Single traversal of the parsed tree. Collects the visible text (same
+    strings soup.get_text() would use), every <a href>, and the first
+    <title>, <h1> and description <meta> tags.
+    """
+    string_types = soup.interesting_string_types or {NavigableString, CData}
+    if isinstance(string_types, type):
+        string_types = {string_types}
+
+    strings, hrefs = [], []
+    title = h1 = meta_name = meta_og = None
+    for node in soup.descendants:
+        if isinstance(node, Tag):
+            name = node.name
+            if name == "a":
+                href = node.get("href")
+                if href is not None:
+                    hrefs.append(href)
+            elif name == "meta":
+                if meta_name is None and node.get("name") == "description":
+                    meta_name = node
+                elif meta_og is None and node.get("property") == "og:description":
+                    meta_og = node
+            elif name == "title" and title is None:
+                title = node
+            elif name == "h1" and h1 is None:
+                h1 = node
+        elif type(node) in string_types:
+            strings.append(node)
+
+    return {
+        "text": " ".join(strings),
+        "hrefs": hrefs,
+        "title": title,
+        "h1": h1,
+        "meta": meta_name or meta_og,
+    }
+
+
+def classify_links(base_url, hrefs):
+    """ One pass over the page links for tel/WhatsApp/social/contact/careers/partner hits """
+    tel, whatsapp, partners = [], [], []
+    socials = {label: "" for _, label in SOCIAL_HOSTS}
+    contact_page = careers_page = None
+    for href in hrefs:
+        if href.startswith("tel:"):
+            tel.append(href.replace("tel:", ""))
+        if "wa.me" in href or "whatsapp.com" in href:
+            whatsapp.append(href)
+        for host, label in SOCIAL_HOSTS:
+            if host in href:
+                socials[label] = href
+                break
+        lowered = href.lower()
+        if contact_page is None and "contact" in lowered:
+            contact_page = urljoin(base_url, href)
+        if careers_page is None and ("career" in lowered or "jobs" in lowered):
+            careers_page = urljoin(base_url, href)
+        if any(p in href for p in PARTNER_MARKERS):
+            partners.append(href)
+    return {
+        "tel": tel,
+        "whatsapp": whatsapp,
+        "socials": socials,
+        "contact_page": contact_page or "N/A",
+        "careers_page": careers_page or "N/A",
+        "partners": _unique(partners),
+    }
+
+
+def find_address(text, lowered_text):
+    for line, lowered_line in zip(text.split("\n"), lowered_text.split("\n")):
+        if len(line) < 150 and any(word in lowered_line for word in ADDRESS_WORDS):
+            return line.strip()
+    return "N/A"
+
+
+def _page_heading(doc):
+    title = doc["title"].string.strip() if doc["title"] else "N/A"
+    meta = doc["meta"]
+    description = meta["content"].strip() if meta and meta.get("content") else ""
+    company_name = doc["h1"].get_text(strip=True) if doc["h1"] else title
+    return title, description, company_name
+
+
+def extract_icp_row(domain, url, html):
+    """ Build the Option 1/4 lead row for one homepage """
+    return extract_icp_fields(domain, url, html, parse_html(html))
+
+
+def extract_icp_fields(domain, url, html, soup, doc=None):
+    """ Extraction stage on an already-parsed page """
+    doc = doc or walk_document(soup)
+    text = doc["text"]
+    lowered_text = text.lower()
+
+    title, description, company_name = _page_heading(doc)
+
+    name_match = NAME_PATTERN.search(text)
+    contact_person = name_match.group(1) if name_match else "N/A"
+
+    industry = INDUSTRY_MATCHER.first(description.lower(), lowered_text)
+    industry = industry.capitalize() if industry else "N/A"
+
+    emails = find_emails(text)
+
+    links = classify_links(url, doc["hrefs"])
+    phones = find_phones(text, links["tel"])
+
+    address = find_address(text, lowered_text)
+
+    tech = [t.capitalize() for t in TECH_MATCHER.all(html.lower())]
+    tech_stack = ", ".join(tech) if tech else "Unknown"
+
+    socials = links["socials"]
+    return {
+        "Website": domain,
+        "Company Name": company_name,
+        "Contact Person": contact_person,
+        "Industry": industry,
+        "Location": address,
+        "Emails": "; ".join(emails) if emails else "N/A",
+        "Phones": "; ".join(phones) if phones else "N/A",
+        "WhatsApp": "; ".join(links["whatsapp"]) if links["whatsapp"] else "N/A",
+        "Contact Page": links["contact_page"],
+        "Careers Page": links["careers_page"],
+        "Tech Stack": tech_stack,
+        "LinkedIn": socials["LinkedIn"] or "N/A",
+        "Twitter": socials["Twitter"] or "N/A",
+        "Facebook": socials["Facebook"] or "N/A",
+        "Instagram": socials["Instagram"] or "N/A",
+        "YouTube": socials["YouTube"] or "N/A",
+        "Gov / Partner Links": "; ".join(links["partners"]) if links["partners"] else "N/A"
+    }
+
+
+def extract_site_page(domain, url, html):
+    """ ICP row for one page of a site plus every link on it (for the site crawl) """
+    soup = parse_html(html)
+    doc = walk_document(soup)
+    return extract_icp_fields(domain, url, html, soup, doc), doc["hrefs"]
+
+
+def merge_icp_rows(row, extra):
+    """ Fold a sub-page row into the homepage row: union the list fields, fill in the missing ones """
+    for key, value in extra.items():
+        if key in MERGED_LIST_FIELDS:
+            values = [v for v in row[key].split("; ") + value.split("; ") if v != "N/A"]
+            row[key] = "; ".join(_unique(values)) if values else "N/A"
+        elif row.get(key) in MISSING_VALUES and value not in MISSING_VALUES:
+            row[key] = value
+    return row
+
+
+def extract_contact_details(soup):
+    """ First email and phone on a page (Option 2 follow-up fetches) """
+    text = soup.get_text()
+    return first_email(text), first_phone(text)
+
+
+def extract_page_contacts(html):
+    """ extract_contact_details on the raw page """
+    return extract_contact_details(parse_html(html))
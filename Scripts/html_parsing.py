@@ -0,0 +1,24 @@
+import importlib.util
+from bs4 import BeautifulSoup
+
+# Parser backends in order of preference. lxml builds the same BeautifulSoup
+# tree several times faster than the pure-Python html.parser, so it is used
+# whenever it is installed (pip install lxml); html.parser is the fallback.
+PARSER_BACKENDS = ["lxml", "html.parser"]
+_BACKEND_MODULES = {"lxml": "lxml", "html.parser": "html.parser"}
+
+
+def backend_available(backend):
+    return importlib.util.find_spec(_BACKEND_MODULES[backend]) is not None
+
+
+def default_backend():
+    return next(b for b in PARSER_BACKENDS if backend_available(b))
+
+
+HTML_PARSER = default_backend()
+
+
+def parse_html(html, backend=None):
+    """ Parse with the fastest installed backend """
+    return BeautifulSoup(html, backend or HTML_PARSER)
@@ -0,0 +1,323 @@
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from resolver import Resolver
+from response_cache import ResponseCache, cache_key
+from scheduler import DeadlineExceeded, RequestScheduler
+
+# Shared HTTP client for every fetch the scraper makes. One Session keeps
+# keep-alive connections open per host, so repeated SerpAPI pages and
+# follow-up page fetches reuse sockets instead of paying a TLS handshake each time.
+HTTP_POOL_CONNECTIONS = 64   # number of per-host pools kept around
+HTTP_POOL_MAXSIZE = 32       # keep-alive connections kept per host
+HTTP_TIMEOUT = 10           # read timeout: how long a slow server may take to answer
+HTTP_CONNECT_TIMEOUT = 3.05  # unreachable hosts are given up on much sooner
+DEFAULT_HEADERS = {"User-Agent": "Mozilla/5.0"}
+# Website page fetches (get_page) are streamed: bodies past PAGE_MAX_BYTES are
+# cut off, and anything that is not HTML is refused from its headers alone.
+PAGE_MAX_BYTES = 2 * 1024 * 1024
+PAGE_CONTENT_TYPES = ("text/html", "application/xhtml+xml")
+READ_CHUNK_BYTES = 64 * 1024
+# robots.txt is fetched once per site before its first page: capped like
+# Google's 500 KiB limit and given less time than a page
+ROBOTS_MAX_BYTES = 512 * 1024
+ROBOTS_TIMEOUT = 5
+
+_settings = {
+    "pool_connections": HTTP_POOL_CONNECTIONS,
+    "pool_maxsize": HTTP_POOL_MAXSIZE,
+    "timeout": HTTP_TIMEOUT,
+    "connect_timeout": HTTP_CONNECT_TIMEOUT,
+    "headers": dict(DEFAULT_HEADERS),
+}
+_session = None
+_cache = None
+_scheduler = None
+_resolver = None
+_lock = threading.Lock()
+
+
+class ResponseSkipped(Exception):
+    """ A page fetch answered with a content type that is not worth downloading """
+    pass
+
+
+class DownloadStats:
+    FIELDS = ("streamed", "truncated", "skipped", "bytes_saved")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"Downloads: {self.streamed} pages streamed, {self.truncated} truncated at "
+                f"{PAGE_MAX_BYTES // 1024} KB, {self.skipped} skipped (not HTML), "
+                f"{self.bytes_saved / 1024:.0f} KB not downloaded")
+
+
+download_stats = DownloadStats()
+
+
+def _build_session():
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=_settings["pool_connections"],
+                          pool_maxsize=_settings["pool_maxsize"])
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(_settings["headers"])
+    return session
+
+
+def configure(pool_connections=None, pool_maxsize=None, timeout=None, headers=None, connect_timeout=None):
+    """ Change pool sizes / defaults; the session is rebuilt on next use """
+    global _session
+    with _lock:
+        if pool_connections is not None:
+            _settings["pool_connections"] = pool_connections
+        if pool_maxsize is not None:
+            _settings["pool_maxsize"] = pool_maxsize
+        if timeout is not None:
+            _settings["timeout"] = timeout
+        if connect_timeout is not None:
+            _settings["connect_timeout"] = connect_timeout
+        if headers is not None:
+            _settings["headers"] = {**DEFAULT_HEADERS, **headers}
+        if _session is not None:
+            _session.close()
+            _session = None
+
+
+def get_session():
+    """ Return the shared Session, creating it on first use (thread-safe) """
+    global _session
+    if _session is None:
+        with _lock:
+            if _session is None:
+                _session = _build_session()
+    return _session
+
+
+def enable_cache(**options):
+    """ Serve GETs from the on-disk response cache (see response_cache.py) """
+    global _cache
+    with _lock:
+        if _cache is None:
+            _cache = ResponseCache(**options)
+    return _cache
+
+
+def cache_summary(reset=False):
+    """ One-line hit/miss/byte report; reset=True starts the counters over """
+    if _cache is None:
+        return "HTTP cache: disabled"
+    summary = _cache.stats.summary()
+    if reset:
+        _cache.stats.reset()
+    return summary
+
+
+def download_summary(reset=False):
+    summary = download_stats.summary()
+    if reset:
+        download_stats.reset()
+    return summary
+
+
+def is_html(headers):
+    """ Missing Content-Type is let through; the parser copes with whatever arrives """
+    content_type = (headers.get("Content-Type") or "").lower()
+    return not content_type or content_type.startswith(PAGE_CONTENT_TYPES)
+
+
+def _declared_length(headers):
+    length = headers.get("Content-Length") or ""
+    return int(length) if length.isdigit() else 0
+
+
+def _read_limited(url, res, max_bytes, html_only, deadline=None):
+    """
+    Read a streamed body up to max_bytes; refuse non-HTML before reading any
+    of it, and give up on the body once deadline (monotonic) has passed
+    """
+    declared = _declared_length(res.headers)
+    if html_only and res.status_code == 200 and not is_html(res.headers):
+        res.close()
+        download_stats.add(skipped=1, bytes_saved=declared)
+        raise ResponseSkipped(f"{url} is {res.headers.get('Content-Type')}, not HTML")
+    chunks, size, truncated = [], 0, False
+    for chunk in res.iter_content(READ_CHUNK_BYTES):
+        if deadline is not None and time.monotonic() >= deadline:
+            res.close()
+            raise DeadlineExceeded(f"{url} was still downloading when the time budget ran out")
+        chunks.append(chunk)
+        size += len(chunk)
+        if max_bytes is not None and size > max_bytes:
+            truncated = True
+            break
+    body = b"".join(chunks)
+    if truncated:
+        body = body[:max_bytes]
+        res.close()
+        download_stats.add(truncated=1, bytes_saved=max(0, declared - max_bytes))
+    res._content = body
+    res._content_consumed = True
+    download_stats.add(streamed=1)
+
+
+def enable_scheduler(**options):
+    """ Put the per-host politeness scheduler (see scheduler.py) in front of every network fetch """
+    global _scheduler
+    with _lock:
+        if _scheduler is None:
+            _scheduler = RequestScheduler(robots_fetch=get_robots, **options)
+    return _scheduler
+
+
+def enable_resolver(**options):
+    """ DNS cache + persistent dead-host cache (see resolver.py) for every fetch """
+    global _resolver
+    with _lock:
+        if _resolver is None:
+            _resolver = Resolver(**options)
+            _resolver.install()
+    return _resolver
+
+
+def dead_host_count():
+    return _resolver.dead_count() if _resolver is not None else 0
+
+
+def clear_dead_hosts():
+    """ Retry every host the resolver has marked unreachable """
+    if _resolver is not None:
+        _resolver.clear()
+
+
+def resolver_summary(reset=False):
+    if _resolver is None:
+        return "Resolver: disabled"
+    summary = _resolver.stats.summary()
+    if reset:
+        _resolver.stats.reset()
+    return summary
+
+
+def _timeouts(timeout, deadline=None):
+    """ (connect, read) pair; a single number is the read timeout. Neither outlasts the deadline """
+    if isinstance(timeout, tuple):
+        connect, read = timeout
+    else:
+        read = timeout or _settings["timeout"]
+        connect = min(_settings["connect_timeout"], read)
+    if deadline is not None:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise DeadlineExceeded("the time budget ran out before the request was sent")
+        connect, read = min(connect, remaining), min(read, remaining)
+    return (connect, read)
+
+
+def _fetch(url, params, headers, timeout, max_bytes=None, html_only=False, track_dead=False,
+           deadline=None, **kwargs):
+    if _scheduler is not None:
+        _scheduler.acquire(url, deadline)
+    streamed = max_bytes is not None or html_only or kwargs.pop("stream", False)
+    try:
+        res = get_session().get(url, params=params, headers=headers, stream=streamed,
+                                timeout=_timeouts(timeout, deadline), **kwargs)
+    except requests.exceptions.RequestException as e:
+        # A timeout cut short by the caller's budget says nothing about the host
+        cut_short = deadline is not None and time.monotonic() >= deadline
+        if track_dead and _resolver is not None and not cut_short:
+            _resolver.record_failure(url, e)
+        raise
+    if track_dead and _resolver is not None:
+        _resolver.record_success(url)
+    if _scheduler is not None:
+        _scheduler.feedback(url, res.status_code, res.headers.get("Retry-After"))
+    if max_bytes is not None or html_only:
+        _read_limited(url, res, max_bytes, html_only, deadline)
+    return res
+
+
+def get(url, params=None, headers=None, timeout=None, use_cache=True,
+        max_bytes=None, html_only=False, track_dead=False, deadline=None, **kwargs):
+    """
+    GET through the shared pool with the default headers and timeout.
+    With track_dead the host goes through the resolver's dead-host cache.
+    With a deadline (time.monotonic()) the scheduler wait, the request and
+    the body read all give up with DeadlineExceeded once it has passed.
+    """
+    if track_dead and _resolver is not None:
+        _resolver.check(url)
+    if _scheduler is not None:
+        _scheduler.check_robots(url, deadline)
+        if track_dead and _resolver is not None:
+            # The robots.txt fetch may just have found the host dead
+            _resolver.check(url)
+    if _cache is None or not use_cache:
+        return _fetch(url, params, headers, timeout, max_bytes, html_only, track_dead, deadline, **kwargs)
+
+    key = cache_key(url, params)
+    cached = _cache.lookup(key)
+    if cached is not None:
+        response, fresh, validators = cached
+        if html_only and not is_html(response.headers):
+            download_stats.add(skipped=1)
+            raise ResponseSkipped(f"{url} is {response.headers.get('Content-Type')}, not HTML")
+        if fresh:
+            _cache.stats.add(hits=1, bytes_from_cache=len(response.content))
+            return response
+        headers = {**(headers or {}), **validators}
+
+    res = _fetch(url, params, headers, timeout, max_bytes, html_only, track_dead, deadline, **kwargs)
+    if res.status_code == 304 and cached is not None:
+        _cache.touch(key)
+        _cache.stats.add(revalidated=1, bytes_from_cache=len(response.content))
+        return response
+    _cache.stats.add(misses=1, bytes_downloaded=len(res.content))
+    if res.status_code == 200:
+        _cache.store(key, res)
+    return res
+
+
+def get_stream(url, params=None, headers=None, timeout=None):
+    """ Uncached GET with the body left unread: consume res.raw / iter_content, then res.close() """
+    if _scheduler is not None:
+        _scheduler.check_robots(url)
+    return _fetch(url, params, headers, timeout, stream=True)
+
+
+def get_robots(url, deadline=None):
+    """ robots.txt fetch for the scheduler: short timeout, size cap, dead-host tracking """
+    return get(url, timeout=ROBOTS_TIMEOUT, max_bytes=ROBOTS_MAX_BYTES, track_dead=True, deadline=deadline)
+
+
+def get_page(url, timeout=None, max_bytes=PAGE_MAX_BYTES, deadline=None):
+    """ Website page fetch: HTML only, at most max_bytes of it (raises ResponseSkipped otherwise) """
+    return get(url, timeout=timeout, max_bytes=max_bytes, html_only=True, track_dead=True, deadline=deadline)
+
+
+def close():
+    global _session, _cache, _resolver
+    with _lock:
+        if _resolver is not None:
+            _resolver.close()
+            _resolver = None
+        if _session is not None:
+            _session.close()
+            _session = None
+        if _cache is not None:
+            _cache.close()
+            _cache = None
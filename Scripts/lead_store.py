@@ -0,0 +1,201 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+import pandas as pd
+
+# Embedded lead store: the system of record that every scraper option
+# writes to and the email campaign reads from. The loose workbooks in
+# output/ are still written, but only as exports.
+LEAD_STORE_PATH = os.path.join("output", "leads.sqlite")
+TEE_BATCH_ROWS = 500
+CONTACT_CHUNK_ROWS = 10_000
+# Leads the campaign still has to contact, in the campaign's column names
+TO_CONTACT_SQL = ("SELECT id AS 'Lead ID', contact_person AS 'Contact Person', company_name AS 'Company Name', "
+                  "contact_email AS 'Contact Email', domain AS 'Domain' FROM leads "
+                  "WHERE contact_email IS NOT NULL AND contacted_at IS NULL")
+EMPTY_VALUES = {"", "N/A", "Unknown", "nan", "None"}
+
+
+def _clean(value):
+    if value is None or (isinstance(value, float) and pd.isnull(value)):
+        return None
+    value = str(value).strip()
+    return None if value in EMPTY_VALUES else value
+
+
+def normalize_domain(value):
+    value = _clean(value)
+    if not value:
+        return None
+    value = value.lower()
+    host = urlparse(value if "://" in value else f"//{value}").hostname or value
+    return host[4:] if host.startswith("www.") else host
+
+
+def lead_fields(row):
+    """ Map a row from any scraper layout onto the store columns """
+    website = _clean(row.get("Website/URL")) or _clean(row.get("Website"))
+    email = _clean(row.get("Contact Email")) or _clean(row.get("Emails"))
+    phone = _clean(row.get("Phone")) or _clean(row.get("Phones"))
+    return {
+        "lead_key": (website or _clean(row.get("Company Name")) or "").lower(),
+        "domain": normalize_domain(website),
+        "website": website,
+        "company_name": _clean(row.get("Company Name")),
+        "contact_person": _clean(row.get("Contact Person")),
+        # ICP rows hold every address found, "a@x.com; b@x.com"; the first is the contact
+        "contact_email": email.split(";")[0].strip() if email else None,
+        "phone": phone.split(";")[0].strip() if phone else None,
+        "industry": _clean(row.get("Industry")),
+        "location": _clean(row.get("Location")),
+    }
+
+
+class LeadStore:
+    def __init__(self, path=LEAD_STORE_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS leads (
+                id INTEGER PRIMARY KEY,
+                source TEXT NOT NULL,
+                lead_key TEXT NOT NULL,
+                domain TEXT,
+                website TEXT,
+                company_name TEXT,
+                contact_person TEXT,
+                contact_email TEXT,
+                phone TEXT,
+                industry TEXT,
+                location TEXT,
+                data TEXT,
+                scraped_at REAL,
+                contacted_at REAL,
+                UNIQUE (source, lead_key)
+            );
+            CREATE INDEX IF NOT EXISTS leads_domain ON leads (domain);
+            CREATE INDEX IF NOT EXISTS leads_contact_email ON leads (contact_email);
+            CREATE INDEX IF NOT EXISTS leads_company_name ON leads (company_name);
+            CREATE INDEX IF NOT EXISTS leads_to_contact ON leads (id)
+                WHERE contact_email IS NOT NULL AND contacted_at IS NULL;
+        """)
+        self._db.commit()
+
+    def add(self, source, rows):
+        """ Insert or refresh rows scraped by one option ("option1".."option4") """
+        now = time.time()
+        records = []
+        for row in rows:
+            fields = lead_fields(row)
+            if not fields["lead_key"]:
+                continue
+            records.append((source, fields["lead_key"], fields["domain"], fields["website"],
+                            fields["company_name"], fields["contact_person"], fields["contact_email"],
+                            fields["phone"], fields["industry"], fields["location"],
+                            json.dumps(row, ensure_ascii=False, default=str), now))
+        with self._lock:
+            self._db.executemany("""
+                INSERT INTO leads (source, lead_key, domain, website, company_name, contact_person,
+                                   contact_email, phone, industry, location, data, scraped_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (source, lead_key) DO UPDATE SET
+                    domain = excluded.domain, website = excluded.website,
+                    company_name = excluded.company_name, contact_person = excluded.contact_person,
+                    contact_email = excluded.contact_email, phone = excluded.phone,
+                    industry = excluded.industry, location = excluded.location,
+                    data = excluded.data, scraped_at = excluded.scraped_at
+            """, records)
+            self._db.commit()
+        return len(records)
+
+    def tee(self, source, rows):
+        """ Yield rows unchanged while recording them in the store in batches """
+        batch = []
+        for row in rows:
+            batch.append(row)
+            yield row
+            if len(batch) >= TEE_BATCH_ROWS:
+                self.add(source, batch)
+                batch = []
+        if batch:
+            self.add(source, batch)
+
+    def count(self):
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM leads").fetchone()[0]
+
+    def leads_to_contact(self, limit=None):
+        """ Leads with an email that have not been contacted yet, in the campaign's column names """
+        sql = TO_CONTACT_SQL + " ORDER BY id"
+        params = ()
+        if limit is not None:
+            sql += " LIMIT ?"
+            params = (limit,)
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    def count_without_email(self):
+        """ Leads not contacted yet that have no email, which leads_to_contact() leaves out """
+        with self._lock:
+            return self._db.execute("SELECT COUNT(*) FROM leads WHERE contact_email IS NULL "
+                                    "AND contacted_at IS NULL").fetchone()[0]
+
+    def iter_leads_to_contact(self, chunk_rows=CONTACT_CHUNK_ROWS):
+        """ leads_to_contact() as DataFrames of chunk_rows leads, so a large store is never loaded whole """
+        last_id = 0
+        while True:
+            with self._lock:
+                chunk = pd.read_sql_query(TO_CONTACT_SQL + " AND id > ? ORDER BY id LIMIT ?", self._db,
+                                          params=(last_id, chunk_rows))
+            if chunk.empty:
+                return
+            last_id = int(chunk['Lead ID'].iloc[-1])
+            yield chunk
+
+    def linkedin_urls(self):
+        """ LinkedIn company pages found so far (Option 2 results and ICP rows) """
+        sql = ("SELECT website FROM leads WHERE website LIKE '%linkedin.com/company/%' UNION "
+               "SELECT json_extract(data, '$.LinkedIn') FROM leads "
+               "WHERE json_extract(data, '$.LinkedIn') LIKE '%linkedin.com/company/%'")
+        with self._lock:
+            return [url for (url,) in self._db.execute(sql)]
+
+    def find(self, domain=None, contact_email=None, company_name=None):
+        clauses, params = [], []
+        for column, value in (("domain", normalize_domain(domain) if domain else None),
+                              ("contact_email", contact_email), ("company_name", company_name)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+        sql = "SELECT * FROM leads" + (" WHERE " + " AND ".join(clauses) if clauses else "")
+        with self._lock:
+            return pd.read_sql_query(sql, self._db, params=params)
+
+    def mark_contacted(self, contact_emails):
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE leads SET contacted_at = ? WHERE contact_email = ?",
+                                 [(now, email) for email in contact_emails])
+            self._db.commit()
+
+    def import_workbooks(self, folder=os.path.join("output")):
+        """ One-off import of the scraper workbooks written before the store existed """
+        imported = 0
+        for name in sorted(os.listdir(folder)):
+            if not name.endswith(".xlsx") or name.startswith("Generated_Emails"):
+                continue
+            df = pd.read_excel(os.path.join(folder, name))
+            source = f"import:{name}"
+            imported += self.add(source, df.to_dict("records"))
+        return imported
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,185 @@
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+
+# Durable outbox for the email campaign. Generated emails are enqueued here
+# before anything is sent, each under a stable message id (campaign +
+# recipient), and move queued -> sending -> sent / failed as the send
+# pipeline works through them. A run that dies halfway is resumed by sending
+# what is still queued; re-enqueueing the same campaign is a no-op for
+# messages already in the outbox. Failed messages stay failed until they are
+# requeued explicitly.
+OUTBOX_PATH = os.path.join("output", "outbox.sqlite")
+OUTBOX_BATCH_ROWS = 10_000   # rows per transaction when enqueueing / paging through the queue
+
+QUEUED = "queued"
+SENDING = "sending"
+SENT = "sent"
+FAILED = "failed"
+STATES = (QUEUED, SENDING, SENT, FAILED)
+INTERRUPTED = "interrupted while sending, delivery unknown (not resent)"
+
+
+def campaign_id(*parts):
+    """ Stable id for a campaign: the template and sender details it was generated from """
+    digest = hashlib.blake2b(digest_size=8)
+    for part in parts:
+        digest.update(f"{part}\0".encode("utf-8"))
+    return digest.hexdigest()
+
+
+def message_id(campaign, recipient_email):
+    digest = hashlib.blake2b(f"{campaign}\0{recipient_email.strip().lower()}".encode("utf-8"), digest_size=12)
+    return digest.hexdigest()
+
+
+class Outbox:
+    def __init__(self, path=OUTBOX_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS messages (
+                id INTEGER PRIMARY KEY,
+                message_id TEXT NOT NULL UNIQUE,
+                campaign TEXT NOT NULL,
+                recipient_email TEXT NOT NULL,
+                company_name TEXT,
+                email_body TEXT,
+                state TEXT NOT NULL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                error TEXT,
+                updated_at REAL
+            );
+            -- also serves the pending scan: entries are ordered by rowid within (campaign, state)
+            CREATE INDEX IF NOT EXISTS messages_state ON messages (campaign, state);
+        """)
+        self._db.commit()
+
+    def enqueue(self, campaign, emails):
+        """ Add generated emails as queued messages; returns how many were new """
+        now = time.time()
+        added = 0
+        batch = []
+
+        def flush():
+            nonlocal added
+            with self._lock:
+                before = self._db.total_changes
+                self._db.executemany("""
+                    INSERT OR IGNORE INTO messages
+                        (message_id, campaign, recipient_email, company_name, email_body, state, updated_at)
+                    VALUES (?, ?, ?, ?, ?, 'queued', ?)""", batch)
+                self._db.commit()
+                added += self._db.total_changes - before
+            batch.clear()
+
+        for email in emails:
+            recipient = str(email['recipient_email']).strip()
+            batch.append((message_id(campaign, recipient), campaign, recipient,
+                          email.get('company_name'), email['email_body'], now))
+            if len(batch) >= OUTBOX_BATCH_ROWS:
+                flush()
+        if batch:
+            flush()
+        return added
+
+    def recover(self, campaign):
+        """
+        Messages a previous run left in "sending" may or may not have gone
+        out; they are failed with INTERRUPTED instead of being resent.
+        """
+        with self._lock:
+            cursor = self._db.execute("""UPDATE messages SET state = 'failed', error = ?, updated_at = ?
+                                         WHERE campaign = ? AND state = 'sending'""",
+                                      (INTERRUPTED, time.time(), campaign))
+            self._db.commit()
+        return cursor.rowcount
+
+    def pending(self, campaign, chunk_rows=OUTBOX_BATCH_ROWS):
+        """ Queued messages in enqueue order, read a page at a time """
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute("""
+                    SELECT id, message_id, recipient_email, company_name, email_body FROM messages
+                    WHERE campaign = ? AND state = 'queued' AND id > ? ORDER BY id LIMIT ?""",
+                                        (campaign, last_id, chunk_rows)).fetchall()
+            if not rows:
+                return
+            last_id = rows[-1][0]
+            for _, mid, recipient, company_name, body in rows:
+                yield {'message_id': mid, 'recipient_email': recipient,
+                       'company_name': company_name, 'email_body': body}
+
+    def mark_sending(self, message):
+        with self._lock:
+            self._db.execute("""UPDATE messages SET state = 'sending', attempts = attempts + 1, updated_at = ?
+                                WHERE message_id = ? AND state IN ('queued', 'sending')""",
+                             (time.time(), message['message_id']))
+            self._db.commit()
+
+    def mark_queued(self, message):
+        """ Put back a message whose send was abandoned before it reached the server """
+        with self._lock:
+            self._db.execute("UPDATE messages SET state = 'queued', updated_at = ? "
+                             "WHERE message_id = ? AND state IN ('queued', 'sending')",
+                             (time.time(), message['message_id']))
+            self._db.commit()
+
+    def mark_sent(self, messages):
+        now = time.time()
+        with self._lock:
+            self._db.executemany("UPDATE messages SET state = 'sent', error = NULL, updated_at = ? "
+                                 "WHERE message_id = ?", [(now, m['message_id']) for m in messages])
+            self._db.commit()
+
+    def mark_failed(self, message, error):
+        with self._lock:
+            self._db.execute("UPDATE messages SET state = 'failed', error = ?, updated_at = ? WHERE message_id = ?",
+                             (str(error)[:500], time.time(), message['message_id']))
+            self._db.commit()
+
+    def failed_errors(self, campaign):
+        """ [(error, count), ...] for the campaign's failed messages, most common first """
+        with self._lock:
+            return self._db.execute("""
+                SELECT error, COUNT(*) FROM messages WHERE campaign = ? AND state = 'failed'
+                GROUP BY error ORDER BY COUNT(*) DESC, error""", (campaign,)).fetchall()
+
+    def requeue(self, campaign, errors=None):
+        """ Queue failed messages again: all of them, or those whose error is one of `errors` """
+        sql = ("UPDATE messages SET state = 'queued', error = NULL, updated_at = ? "
+               "WHERE campaign = ? AND state = 'failed'")
+        params = [time.time(), campaign]
+        if errors is not None:
+            errors = list(errors)
+            if not errors:
+                return 0
+            sql += f" AND error IN ({', '.join('?' * len(errors))})"
+            params += errors
+        with self._lock:
+            cursor = self._db.execute(sql, params)
+            self._db.commit()
+        return cursor.rowcount
+
+    def counts(self, campaign):
+        with self._lock:
+            rows = self._db.execute("SELECT state, COUNT(*) FROM messages WHERE campaign = ? GROUP BY state",
+                                    (campaign,)).fetchall()
+        counts = dict.fromkeys(STATES, 0)
+        counts.update(rows)
+        return counts
+
+    def summary(self, campaign):
+        counts = self.counts(campaign)
+        return "Outbox: " + ", ".join(f"{counts[state]} {state}" for state in STATES)
+
+    def close(self):
+        with self._lock:
+            self._db.close()
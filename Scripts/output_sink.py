@@ -0,0 +1,166 @@
+import csv
+import os
+from openpyxl import Workbook, load_workbook
+from rich.console import Console
+
+# Schema-driven output sink for the scraper options. Rows are streamed to
+# disk in bounded chunks: xlsx through openpyxl's write-only mode, CSV by
+# plain appends and Parquet one row group per chunk, so peak memory stays
+# flat however large the output file gets.
+OUTPUT_FOLDER = "output"
+OUTPUT_FORMATS = ("xlsx", "csv", "parquet")
+CHUNK_ROWS = 1000
+SHEET_TITLE = "ICP Data"
+MISSING = "N/A"
+
+console = Console()
+
+# Column layouts: (header, row keys tried in order)
+ICP_LAYOUT = [
+    ("Website", ("Website",)), ("Company Name", ("Company Name",)), ("Contact Person", ("Contact Person",)),
+    ("Industry", ("Industry",)), ("Location", ("Location",)), ("Contact Email", ("Emails",)),
+    ("Phones", ("Phones",)), ("WhatsApp", ("WhatsApp",)), ("Contact Page", ("Contact Page",)),
+    ("Careers Page", ("Careers Page",)), ("Tech Stack", ("Tech Stack",)), ("LinkedIn", ("LinkedIn",)),
+    ("Twitter", ("Twitter",)), ("Facebook", ("Facebook",)), ("Instagram", ("Instagram",)),
+    ("YouTube", ("YouTube",)), ("Gov / Partner Links", ("Gov / Partner Links",)),
+]
+GENERAL_LAYOUT = [
+    ("Company Name", ("Company Name",)), ("Contact Person", ("Contact Person",)), ("Industry", ("Industry",)),
+    ("Website/URL", ("Website/URL",)), ("Location", ("Location",)), ("Company Size", ("Company Size",)),
+    ("Tech Stack", ("Tech Stack",)), ("Contact Email", ("Contact Email",)), ("Phone", ("Phone",)),
+]
+SCRAPINGDOG_LAYOUT = [
+    ("Company Name", ("Company Name",)), ("Contact Person", ("Contact Person",)), ("Industry", ("Industry",)),
+    ("Website/URL", ("Website/URL", "Website")), ("Location", ("Location",)),
+    ("Company Size", ("Company Size", "Size")), ("Tech Stack", ("Tech Stack",)),
+    ("Contact Email", ("Contact Email",)), ("Phone", ("Phone",)), ("Employees", ("Employees",)),
+    ("Employee Positions", ("Employee Positions",)), ("Profiles", ("Profiles",)), ("Updates", ("Updates",)),
+    ("Similar Companies", ("Similar Companies",)),
+]
+
+
+def row_values(layout, row):
+    values = []
+    for _, keys in layout:
+        value = MISSING
+        for key in keys:
+            if key in row:
+                value = row[key]
+                break
+        values.append(value)
+    return values
+
+
+class OutputSink:
+    """
+    Streams rows for one layout into output/<name>.<fmt>. Existing files are
+    appended to: CSV in place, xlsx/Parquet by streaming the old rows into
+    the new file first (never loading the whole workbook into memory).
+    """
+
+    def __init__(self, layout, filename, fmt="xlsx", folder=OUTPUT_FOLDER, chunk_rows=CHUNK_ROWS):
+        if fmt not in OUTPUT_FORMATS:
+            raise ValueError(f"Unknown output format {fmt!r}, expected one of {OUTPUT_FORMATS}")
+        self.layout = layout
+        self.headers = [header for header, _ in layout]
+        self.fmt = fmt
+        self.chunk_rows = chunk_rows
+        os.makedirs(folder, exist_ok=True)
+        self.path = os.path.join(folder, f"{os.path.splitext(filename)[0]}.{fmt}")
+        self.rows_written = 0
+        self._buffer = []
+        self._opened = False
+
+    # ---------- per-format writers ----------
+    def _open(self):
+        getattr(self, f"_open_{self.fmt}")()
+
+    def _open_xlsx(self):
+        self._tmp_path = f"{self.path}.tmp"
+        self._workbook = Workbook(write_only=True)
+        self._sheet = self._workbook.create_sheet(SHEET_TITLE)
+        if os.path.exists(self.path):
+            existing = load_workbook(self.path, read_only=True)
+            for values in existing.active.iter_rows(values_only=True):
+                self._sheet.append(list(values))
+            existing.close()
+        else:
+            self._sheet.append(self.headers)
+        self._writer = self._sheet.append
+
+    def _open_csv(self):
+        new_file = not os.path.exists(self.path)
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        writer = csv.writer(self._file)
+        if new_file:
+            writer.writerow(self.headers)
+        self._writer = writer.writerow
+
+    def _open_parquet(self):
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+        self._pa = pa
+        self._tmp_path = f"{self.path}.tmp"
+        self._schema = pa.schema([(header, pa.string()) for header in self.headers])
+        self._parquet = pq.ParquetWriter(self._tmp_path, self._schema)
+        if os.path.exists(self.path):
+            for batch in pq.ParquetFile(self.path).iter_batches(batch_size=self.chunk_rows):
+                self._parquet.write_table(pa.Table.from_batches([batch]).cast(self._schema))
+
+    def _write_chunk(self, chunk):
+        if self.fmt == "parquet":
+            columns = list(zip(*chunk))
+            self._parquet.write_table(self._pa.table(
+                {header: [None if v is None else str(v) for v in column]
+                 for header, column in zip(self.headers, columns)}, schema=self._schema))
+        else:
+            for values in chunk:
+                self._writer(values)
+        if self.fmt == "csv":
+            self._file.flush()
+
+    # ---------- public API ----------
+    def write(self, rows):
+        for row in rows:
+            self._buffer.append(row_values(self.layout, row))
+            if len(self._buffer) >= self.chunk_rows:
+                self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        if not self._opened:
+            self._open()
+            self._opened = True
+        self._write_chunk(self._buffer)
+        self.rows_written += len(self._buffer)
+        self._buffer = []
+
+    def close(self):
+        self.flush()
+        if not self.rows_written:
+            console.print("[yellow]⚠️ No data to save.[/yellow]")
+            return None
+        if self.fmt == "xlsx":
+            self._workbook.save(self._tmp_path)
+            os.replace(self._tmp_path, self.path)
+        elif self.fmt == "parquet":
+            self._parquet.close()
+            os.replace(self._tmp_path, self.path)
+        else:
+            self._file.close()
+        console.print(f"\n [green]Saved {self.rows_written} rows to {self.path}[/green]")
+        return self.path
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def write_rows(layout, rows, filename, fmt="xlsx"):
+    """ Stream an iterable of row dicts into one output file """
+    with OutputSink(layout, filename, fmt) as sink:
+        sink.write(rows)
+    return sink.path
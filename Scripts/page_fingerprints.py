@@ -0,0 +1,83 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from extractor import EXTRACTOR_VERSION
+
+# Change detection for re-scrapes. Every extracted page is stored with a
+# fingerprint of its body (plus the domain and EXTRACTOR_VERSION); when a
+# later fetch of the same URL has the same fingerprint the stored result is
+# reused and the page is never parsed. With conditional GETs in front, an
+# unchanged site costs a 304 and one SQLite lookup.
+FINGERPRINTS_PATH = "output/page_fingerprints.sqlite"
+
+
+def fingerprint(domain, content):
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(f"{EXTRACTOR_VERSION}\0{domain}\0".encode("utf-8"))
+    digest.update(content)
+    return digest.hexdigest()
+
+
+class ChangeStats:
+    FIELDS = ("reused", "changed", "new")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"Change detection: {self.reused} pages unchanged (stored row reused), "
+                f"{self.changed} changed, {self.new} new")
+
+
+class PageFingerprints:
+    def __init__(self, path=FINGERPRINTS_PATH):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.stats = ChangeStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS pages (
+                kind TEXT, url TEXT, fingerprint TEXT, result TEXT, extracted_at REAL,
+                PRIMARY KEY (kind, url)
+            )""")
+        self._db.commit()
+
+    def lookup(self, kind, url, page_fingerprint):
+        """ Stored result if the page is unchanged, else None (and the miss is counted) """
+        with self._lock:
+            row = self._db.execute("SELECT fingerprint, result FROM pages WHERE kind = ? AND url = ?",
+                                   (kind, url)).fetchone()
+        if row is None:
+            self.stats.add(new=1)
+            return None
+        if row[0] != page_fingerprint:
+            self.stats.add(changed=1)
+            return None
+        self.stats.add(reused=1)
+        return json.loads(row[1])
+
+    def save(self, kind, url, page_fingerprint, result):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?)",
+                             (kind, url, page_fingerprint, json.dumps(result, ensure_ascii=False), time.time()))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
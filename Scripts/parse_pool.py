@@ -0,0 +1,117 @@
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+import extractor
+from page_fingerprints import fingerprint
+
+# CPU stage of the scraper. Fetch threads only download; parsing and
+# extraction run in a pool of worker processes (one per core), so they are
+# not serialised by the GIL. Pages are handed over as the raw bytes the
+# fetch produced and decoded in the worker. Without enable() everything
+# runs inline in the calling thread.
+PARSE_WORKERS = os.cpu_count() or 1
+# Workers are never forked from the threaded scraper: a forked child can
+# inherit a lock (logging, sqlite, the http pools) that another thread held
+PARSE_START_METHOD = "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+# Warm-up tasks sleep a little so no worker can take them all; enable() returns once every worker ran one
+WARM_UP_TASK_SECONDS = 0.05
+WARM_UP_ROUNDS = 20
+
+_pool = None
+_fingerprints = None
+_lock = threading.Lock()
+
+
+def enable(workers=PARSE_WORKERS):
+    """ Start the worker processes; call it before the fetch threads start """
+    global _pool
+    with _lock:
+        if _pool is None and workers > 1:
+            _pool = ProcessPoolExecutor(max_workers=workers,
+                                        mp_context=multiprocessing.get_context(PARSE_START_METHOD))
+            _warm_up(_pool, workers)
+    return _pool
+
+
+def _warm_up(pool, workers):
+    """ Launch every worker now, with the extractor imported, rather than on the first pages """
+    pids = set()
+    for _ in range(WARM_UP_ROUNDS):
+        pids.update(pool.map(_ready, [WARM_UP_TASK_SECONDS] * workers))
+        if len(pids) >= workers:
+            return
+
+
+def use_fingerprints(store):
+    """ Reuse stored results for pages whose body has not changed (a page_fingerprints.PageFingerprints) """
+    global _fingerprints
+    _fingerprints = store
+
+
+def close():
+    global _pool
+    with _lock:
+        if _pool is not None:
+            _pool.shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _decode(content, encoding):
+    return content.decode(encoding or "utf-8", errors="replace")
+
+
+# ---------- worker-side functions (must stay importable top-level) ----------
+def _ready(seconds):
+    time.sleep(seconds)
+    return os.getpid()
+
+
+def _icp_row(domain, url, content, encoding):
+    return extractor.extract_icp_row(domain, url, _decode(content, encoding))
+
+
+def _site_page(domain, url, content, encoding):
+    return extractor.extract_site_page(domain, url, _decode(content, encoding))
+
+
+def _contacts(domain, url, content, encoding):
+    return extractor.extract_page_contacts(_decode(content, encoding))
+
+
+def _run(fn, *args):
+    pool = _pool
+    if pool is None:
+        return fn(*args)
+    return pool.submit(fn, *args).result()
+
+
+def _extract(kind, fn, domain, url, res):
+    store = _fingerprints
+    if store is None:
+        return _run(fn, domain, url, res.content, res.encoding)
+    page_fingerprint = fingerprint(domain, res.content)
+    result = store.lookup(kind, url, page_fingerprint)
+    if result is None:
+        result = _run(fn, domain, url, res.content, res.encoding)
+        store.save(kind, url, page_fingerprint, result)
+    return result
+
+
+# ---------- public API (called from the fetch threads) ----------
+def extract_icp_row(domain, url, res):
+    """ extractor.extract_icp_row on a fetched response, in the pool when enabled """
+    return _extract("icp", _icp_row, domain, url, res)
+
+
+def extract_site_page(domain, url, res):
+    """ extractor.extract_site_page on a fetched response: (row, hrefs) """
+    row, hrefs = _extract("site", _site_page, domain, url, res)
+    return row, hrefs
+
+
+def extract_page_contacts(domain, url, res):
+    """ extractor.extract_page_contacts on a fetched response: (email, phone) """
+    email, phone = _extract("contact", _contacts, domain, url, res)
+    return email, phone
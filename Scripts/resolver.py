@@ -0,0 +1,198 @@
+import os
+import socket
+import sqlite3
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+
+# Resolver layer for http_client. Successful DNS lookups are cached in
+# memory for a few minutes, and website hosts that keep failing outright
+# (NXDOMAIN, connection refused, connect timeout) are remembered on disk
+# with an expiry so the next run fails them immediately instead of waiting
+# on a timeout. Only website page fetches are tracked (http_client.get_page);
+# the API hosts never are.
+DEAD_HOSTS_PATH = "output/dead_hosts.sqlite"
+DNS_TTL_SECONDS = 300
+DEAD_HOST_TTLS = {                 # reason: seconds before the host is tried again
+    "nxdomain": 7 * 24 * 3600,
+    "refused": 24 * 3600,
+    "timeout": 6 * 3600,
+}
+# Failures in a row before a host is marked dead; one slow answer or a
+# restarting server should not take a host out for hours. Strikes are kept on
+# disk, so they add up across runs (Option 4 fetches a homepage once per
+# run), and are forgotten once a host has not failed for STRIKE_WINDOW_SECONDS.
+DEAD_AFTER_FAILURES = {"nxdomain": 1, "refused": 2, "timeout": 3}
+STRIKE_WINDOW_SECONDS = 7 * 24 * 3600
+EXEMPT_HOSTS = {"serpapi.com", "api.scrapingdog.com"}
+# Only "this name does not exist" answers; temporary resolver failures are not recorded
+NXDOMAIN_ERRNOS = {socket.EAI_NONAME, getattr(socket, "EAI_NODATA", socket.EAI_NONAME)}
+
+
+class HostDead(Exception):
+    pass
+
+
+def hostname_of(url):
+    """ Host, plus the port when the URL names one explicitly """
+    parsed = urlparse(url)
+    host = (parsed.hostname or "").lower()
+    return f"{host}:{parsed.port}" if parsed.port else host
+
+
+def failure_reason(exc):
+    """ "nxdomain" / "refused" / "timeout" if exc means the host is unreachable, else None """
+    if isinstance(exc, requests.exceptions.ConnectTimeout):
+        return "timeout"
+    seen, stack = set(), [exc]
+    while stack:
+        err = stack.pop()
+        if not isinstance(err, BaseException) or id(err) in seen:
+            continue
+        seen.add(id(err))
+        if isinstance(err, socket.gaierror):
+            return "nxdomain" if err.errno in NXDOMAIN_ERRNOS else None
+        if isinstance(err, ConnectionRefusedError):
+            return "refused"
+        stack.extend([getattr(err, "reason", None), err.__cause__, err.__context__, *err.args])
+    return None
+
+
+class ResolverStats:
+    FIELDS = ("dns_hits", "dns_lookups", "dead_skipped", "marked_dead")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"Resolver: {self.dns_hits} DNS cache hits, {self.dns_lookups} lookups, "
+                f"{self.dead_skipped} requests to known-dead hosts failed fast, {self.marked_dead} hosts marked dead")
+
+
+class Resolver:
+    def __init__(self, path=DEAD_HOSTS_PATH, dns_ttl=DNS_TTL_SECONDS, dead_ttls=None):
+        self.dns_ttl = dns_ttl
+        self.dead_ttls = DEAD_HOST_TTLS if dead_ttls is None else dead_ttls
+        self.stats = ResolverStats()
+        self._lock = threading.Lock()
+        self._dns = {}
+        self._strikes = {}   # host -> (reason, consecutive failures, last failure)
+        self._getaddrinfo = None
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS dead_hosts (
+                                host TEXT PRIMARY KEY, reason TEXT, failed_at REAL, expires_at REAL)""")
+        self._db.execute("""CREATE TABLE IF NOT EXISTS host_strikes (
+                                host TEXT PRIMARY KEY, reason TEXT, failures INTEGER, failed_at REAL)""")
+        now = time.time()
+        self._db.execute("DELETE FROM dead_hosts WHERE expires_at < ?", (now,))
+        self._db.execute("DELETE FROM host_strikes WHERE failed_at < ?", (now - STRIKE_WINDOW_SECONDS,))
+        self._db.commit()
+        self._dead = {host: (reason, expires_at) for host, reason, expires_at
+                      in self._db.execute("SELECT host, reason, expires_at FROM dead_hosts")}
+        self._strikes = {host: (reason, failures, failed_at) for host, reason, failures, failed_at
+                         in self._db.execute("SELECT host, reason, failures, failed_at FROM host_strikes")}
+
+    # ---------- positive DNS cache ----------
+    def install(self):
+        """ Route socket.getaddrinfo (used by urllib3) through the cache """
+        if self._getaddrinfo is None:
+            self._getaddrinfo = socket.getaddrinfo
+            socket.getaddrinfo = self.getaddrinfo
+
+    def uninstall(self):
+        if self._getaddrinfo is not None:
+            socket.getaddrinfo = self._getaddrinfo
+            self._getaddrinfo = None
+
+    def getaddrinfo(self, host, port, family=0, type=0, proto=0, flags=0):
+        key = (host, port, family, type, proto, flags)
+        now = time.monotonic()
+        cached = self._dns.get(key)
+        if cached is not None and cached[1] > now:
+            self.stats.add(dns_hits=1)
+            return cached[0]
+        self.stats.add(dns_lookups=1)
+        result = self._getaddrinfo(host, port, family, type, proto, flags)
+        self._dns[key] = (result, now + self.dns_ttl)
+        return result
+
+    # ---------- negative cache ----------
+    def check(self, url):
+        """ Raise HostDead for hosts that failed recently, without touching the network """
+        host = hostname_of(url)
+        dead = self._dead.get(host)
+        if dead is None:
+            return
+        reason, expires_at = dead
+        if expires_at > time.time():
+            self.stats.add(dead_skipped=1)
+            raise HostDead(f"{host} is unreachable ({reason}), skipped until it expires")
+        with self._lock:
+            self._dead.pop(host, None)
+
+    def record_failure(self, url, exc):
+        reason = failure_reason(exc)
+        if reason is None or reason not in self.dead_ttls:
+            return
+        host = hostname_of(url)
+        if host.split(":")[0].removeprefix("www.") in EXEMPT_HOSTS:
+            return
+        now = time.time()
+        expires_at = now + self.dead_ttls[reason]
+        with self._lock:
+            previous, count, failed_at = self._strikes.get(host, (reason, 0, now))
+            fresh = previous == reason and now - failed_at <= STRIKE_WINDOW_SECONDS
+            count = count + 1 if fresh else 1
+            if count < DEAD_AFTER_FAILURES.get(reason, 1):
+                self._strikes[host] = (reason, count, now)
+                self._db.execute("INSERT OR REPLACE INTO host_strikes VALUES (?, ?, ?, ?)",
+                                 (host, reason, count, now))
+                self._db.commit()
+                return
+            self._strikes.pop(host, None)
+            self._dead[host] = (reason, expires_at)
+            self._db.execute("DELETE FROM host_strikes WHERE host = ?", (host,))
+            self._db.execute("INSERT OR REPLACE INTO dead_hosts VALUES (?, ?, ?, ?)",
+                             (host, reason, now, expires_at))
+            self._db.commit()
+        self.stats.add(marked_dead=1)
+
+    def record_success(self, url):
+        host = hostname_of(url)
+        if host in self._strikes:
+            with self._lock:
+                if self._strikes.pop(host, None) is not None:
+                    self._db.execute("DELETE FROM host_strikes WHERE host = ?", (host,))
+                    self._db.commit()
+
+    def dead_count(self):
+        now = time.time()
+        return sum(1 for _, expires_at in self._dead.values() if expires_at > now)
+
+    def clear(self):
+        """ Forget every dead host, so all of them are tried again """
+        with self._lock:
+            self._dead.clear()
+            self._strikes.clear()
+            self._db.execute("DELETE FROM dead_hosts")
+            self._db.execute("DELETE FROM host_strikes")
+            self._db.commit()
+
+    def close(self):
+        self.uninstall()
+        with self._lock:
+            self._db.close()
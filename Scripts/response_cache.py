@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+import time
+from urllib.parse import urlencode
+from requests.structures import CaseInsensitiveDict
+
+# Disk-backed HTTP response cache used by http_client. Entries are keyed by
+# URL + request params, expire after a TTL, are revalidated with
+# ETag / Last-Modified once stale, and the least recently used entries are
+# evicted once the cache grows past CACHE_MAX_BYTES.
+CACHE_PATH = "output/http_cache.sqlite"
+CACHE_TTL_SECONDS = 24 * 3600
+CACHE_MAX_BYTES = 512 * 1024 * 1024
+# Params that must never end up in a cache key (they do not change the answer)
+SECRET_PARAMS = {"api_key"}
+
+
+def cache_key(url, params=None):
+    if not params:
+        return url
+    items = sorted((k, str(v)) for k, v in dict(params).items() if k not in SECRET_PARAMS)
+    return f"{url}?{urlencode(items)}"
+
+
+class CachedResponse:
+    """ The parts of requests.Response the scraper uses, rebuilt from a cache entry """
+
+    def __init__(self, url, status_code, headers, content, encoding):
+        self.url = url
+        self.status_code = status_code
+        self.headers = CaseInsensitiveDict(headers)
+        self.content = content
+        self.encoding = encoding
+        self.from_cache = True
+
+    @property
+    def text(self):
+        return self.content.decode(self.encoding or "utf-8", errors="replace")
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class CacheStats:
+    FIELDS = ("hits", "revalidated", "misses", "bytes_from_cache", "bytes_downloaded")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"HTTP cache: {self.hits} hits, {self.revalidated} revalidated (304), {self.misses} misses, "
+                f"{self.bytes_from_cache / 1024:.0f} KB served from cache, "
+                f"{self.bytes_downloaded / 1024:.0f} KB downloaded")
+
+
+class ResponseCache:
+    def __init__(self, path=CACHE_PATH, ttl=CACHE_TTL_SECONDS, max_bytes=CACHE_MAX_BYTES):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT,
+                status INTEGER,
+                headers TEXT,
+                encoding TEXT,
+                body BLOB,
+                etag TEXT,
+                last_modified TEXT,
+                stored_at REAL,
+                last_access REAL,
+                size INTEGER
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_lru ON responses (last_access)")
+        self._db.commit()
+        self._total_bytes = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def lookup(self, key):
+        """ Return (response, fresh, validators) or None """
+        with self._lock:
+            row = self._db.execute(
+                "SELECT url, status, headers, encoding, body, etag, last_modified, stored_at "
+                "FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+        url, status, headers, encoding, body, etag, last_modified, stored_at = row
+        response = CachedResponse(url, status, json.loads(headers), body, encoding)
+        fresh = time.time() - stored_at < self.ttl
+        validators = {}
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return response, fresh, validators
+
+    def store(self, key, response):
+        content = response.content
+        etag = response.headers.get("ETag")
+        last_modified = response.headers.get("Last-Modified")
+        headers = dict(response.headers)
+        encoding = response.encoding or getattr(response, "apparent_encoding", None)
+        now = time.time()
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(headers), encoding, content,
+                 etag, last_modified, now, now, len(content)))
+            self._total_bytes += len(content) - (old[0] if old else 0)
+            self._evict()
+            self._db.commit()
+
+    def touch(self, key):
+        """ A 304 came back: the stored entry is fresh again """
+        with self._lock:
+            self._db.execute("UPDATE responses SET stored_at = ? WHERE key = ?", (time.time(), key))
+            self._db.commit()
+
+    def _evict(self):
+        if self._total_bytes <= self.max_bytes:
+            return
+        target = self.max_bytes * 0.9
+        while self._total_bytes > target:
+            oldest = self._db.execute(
+                "SELECT key, size FROM responses ORDER BY last_access LIMIT 256").fetchall()
+            if not oldest:
+                break
+            for key, size in oldest:
+                if self._total_bytes <= target:
+                    break
+                self._db.execute("DELETE FROM responses WHERE key = ?", (key,))
+                self._total_bytes -= size
+
+    def close(self):
+        with self._lock:
+            self._db.close()
@@ -0,0 +1,188 @@
+import itertools
+import threading
+import time
+from urllib.parse import urlparse
+from urllib.robotparser import RobotFileParser
+
+# Politeness scheduler in front of every network fetch in http_client.
+# Each host gets a token bucket, SerpAPI / ScrapingDog get their own quota
+# buckets, API calls are granted before follow-up page fetches, and hosts
+# that are waiting at the same priority are served round-robin.
+PRIORITY_API = 0
+PRIORITY_PAGE = 1
+
+HOST_RATE = 1.0          # requests/sec per website host
+HOST_BURST = 2
+API_QUOTAS = {           # host: (requests/sec, burst)
+    "serpapi.com": (5.0, 5),
+    "api.scrapingdog.com": (2.0, 2),
+}
+RESPECT_ROBOTS = True
+ROBOTS_USER_AGENT = "Mozilla/5.0"
+# After a 429 the host rate is divided by this (and restored slowly on success)
+BACKOFF_FACTOR = 2.0
+MIN_HOST_RATE = 0.05
+
+
+class RobotsDisallowed(Exception):
+    pass
+
+
+class DeadlineExceeded(Exception):
+    """ The caller's time budget ran out before the request could be completed """
+    pass
+
+
+def host_of(url):
+    host = (urlparse(url).hostname or "").lower()
+    return host[4:] if host.startswith("www.") else host
+
+
+class TokenBucket:
+    """ Not thread-safe on its own; the scheduler calls it under its lock """
+
+    def __init__(self, rate, burst):
+        self.rate = rate
+        self.base_rate = rate
+        self.burst = burst
+        self.tokens = burst
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+
+    def _refill(self, now):
+        self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def wait_time(self, now):
+        self._refill(now)
+        if now < self.paused_until:
+            return self.paused_until - now
+        return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+    def take(self, now):
+        self._refill(now)
+        self.tokens -= 1
+
+
+class RequestScheduler:
+    def __init__(self, host_rate=HOST_RATE, host_burst=HOST_BURST, api_quotas=None,
+                 respect_robots=RESPECT_ROBOTS, robots_fetch=None):
+        self.host_rate = host_rate
+        self.host_burst = host_burst
+        self.api_quotas = API_QUOTAS if api_quotas is None else api_quotas
+        self.respect_robots = respect_robots
+        self.robots_fetch = robots_fetch
+        self.throttled = 0
+        self._cond = threading.Condition()
+        self._buckets = {}
+        self._last_grant = {}
+        self._waiting = []
+        self._seq = itertools.count()
+        self._robots = {}
+        self._robots_locks = {}
+
+    def priority_of(self, host):
+        return PRIORITY_API if host in self.api_quotas else PRIORITY_PAGE
+
+    def _bucket(self, host):
+        bucket = self._buckets.get(host)
+        if bucket is None:
+            rate, burst = self.api_quotas.get(host, (self.host_rate, self.host_burst))
+            bucket = self._buckets[host] = TokenBucket(rate, burst)
+        return bucket
+
+    # ---------- robots.txt ----------
+    def _robots_for(self, url, deadline=None):
+        parsed = urlparse(url)
+        origin = f"{parsed.scheme}://{parsed.netloc}"
+        with self._cond:
+            if origin in self._robots:
+                return self._robots[origin]
+            lock = self._robots_locks.setdefault(origin, threading.Lock())
+        with lock:
+            if origin not in self._robots:
+                parser = None
+                try:
+                    res = self.robots_fetch(f"{origin}/robots.txt", deadline=deadline)
+                    if res.status_code == 200:
+                        parser = RobotFileParser()
+                        parser.parse(res.text.splitlines())
+                except DeadlineExceeded:
+                    raise   # not remembered: a later fetch with time left tries again
+                except Exception:
+                    parser = None
+                with self._cond:
+                    self._robots[origin] = parser
+                    delay = parser.crawl_delay(ROBOTS_USER_AGENT) if parser else None
+                    if delay:
+                        bucket = self._bucket(host_of(url))
+                        bucket.rate = bucket.base_rate = min(bucket.rate, 1.0 / float(delay))
+                        bucket.burst = 1
+        return self._robots[origin]
+
+    def check_robots(self, url, deadline=None):
+        """ Raise RobotsDisallowed if robots.txt forbids url; its first fetch per origin is bounded by deadline """
+        host = host_of(url)
+        if not self.respect_robots or self.robots_fetch is None or host in self.api_quotas:
+            return
+        if urlparse(url).path == "/robots.txt":
+            return
+        parser = self._robots_for(url, deadline)
+        if parser is not None and not parser.can_fetch(ROBOTS_USER_AGENT, url):
+            raise RobotsDisallowed(f"robots.txt disallows {url}")
+
+    # ---------- rate limiting ----------
+    def _next_ready(self, now):
+        """ Highest-priority waiting ticket whose host has a token; least recently served host first """
+        best, best_key, soonest = None, None, None
+        for ticket in self._waiting:
+            priority, seq, host = ticket
+            wait = self._bucket(host).wait_time(now)
+            if wait > 0:
+                soonest = wait if soonest is None else min(soonest, wait)
+                continue
+            key = (priority, self._last_grant.get(host, 0.0), seq)
+            if best_key is None or key < best_key:
+                best, best_key = ticket, key
+        return best, soonest
+
+    def acquire(self, url, deadline=None):
+        """ Block until a request to url may be sent, or raise DeadlineExceeded at deadline (monotonic) """
+        host = host_of(url)
+        ticket = (self.priority_of(host), next(self._seq), host)
+        with self._cond:
+            self._waiting.append(ticket)
+            while True:
+                now = time.monotonic()
+                best, soonest = self._next_ready(now)
+                if best is ticket:
+                    self._waiting.remove(ticket)
+                    self._bucket(host).take(now)
+                    self._last_grant[host] = now
+                    self._cond.notify_all()
+                    return
+                if deadline is not None and now >= deadline:
+                    self._waiting.remove(ticket)
+                    self._cond.notify_all()
+                    raise DeadlineExceeded(f"no slot for {host} within the time budget")
+                # Every grant notifies; the timeout covers buckets refilling with time
+                timeout = min(soonest, 0.25) if best is None else 0.05
+                if deadline is not None:
+                    timeout = min(timeout, deadline - now)
+                self._cond.wait(timeout=timeout)
+
+    def feedback(self, url, status_code, retry_after=None):
+        """ Slow a host down after 429/503, recover gradually on success """
+        host = host_of(url)
+        with self._cond:
+            bucket = self._bucket(host)
+            if status_code in (429, 503):
+                self.throttled += 1
+                bucket.rate = max(MIN_HOST_RATE, bucket.rate / BACKOFF_FACTOR)
+                pause = 1.0 / bucket.rate
+                if retry_after and str(retry_after).isdigit():
+                    pause = max(pause, float(retry_after))
+                bucket.paused_until = time.monotonic() + pause
+            elif bucket.rate < bucket.base_rate:
+                bucket.rate = min(bucket.base_rate, bucket.rate * 1.1)
+            self._cond.notify_all()
@@ -1,21 +1,41 @@
-import requests
-import re
-from bs4 import BeautifulSoup
-from urllib.parse import urljoin, urlparse
-from openpyxl import Workbook, load_workbook
+from urllib.parse import urlparse
 from rich.console import Console
-from concurrent.futures import ThreadPoolExecutor, as_completed
 import os
+import time
 from rich.console import Console
 from rich.panel import Panel
 from rich.text import Text
 from rich.prompt import Prompt
 import tkinter as tk
 from tkinter import filedialog
+from crawl_engine import CrawlEngine
+from crawl_journal import CrawlJournal, journal_path
+from dedup_index import DedupIndex
+import parse_pool
+from page_fingerprints import PageFingerprints
+import site_crawl
+from lead_store import LeadStore
+from output_sink import GENERAL_LAYOUT, ICP_LAYOUT, SCRAPINGDOG_LAYOUT, OutputSink, write_rows
+import http_client
+from search_cache import SearchCache, SearchStats, search_engines
+from enrichment import EnrichmentStage
+from scrapingdog import CompanyCache, QuotaExhausted, ScrapingDogClient, enrich_batch
 
 # API Keys (for Options 2 & 3)
 SCRAPING_DOG_API_KEY = "Your ScrapingDog Api"
 SERPAPI_KEY = "Your SerpApi"
+# Option 3 batch mode rotates through these when one key's daily quota is used up
+SCRAPING_DOG_API_KEYS = [SCRAPING_DOG_API_KEY]
+
+# Crawl concurrency (Option 4)
+CRAWL_WORKERS = 32
+CRAWL_PER_HOST = 2
+
+# Output file format for every option: "xlsx", "csv" or "parquet"
+OUTPUT_FORMAT = "xlsx"
+
+# SerpAPI / ScrapingDog can take a while to answer a 100-result page
+API_TIMEOUT = 30
 
 console = Console()
 
@@ -23,181 +43,48 @@ console = Console()
 if not os.path.exists("output"):
     os.makedirs("output")
 
-
-INDUSTRY_KEYWORDS = [
-    "software", "ai", "artificial intelligence", "cloud", "data", "e-learning", "cybersecurity",
-    "healthcare", "fintech", "education", "devops", "iot", "blockchain", "logistics", "consulting"
-]
-NAME_PATTERN = re.compile(r"\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)+)\b")
+search_cache = lead_store = dedup = scrapingdog_client = fingerprints = None
+
+def open_stores():
+    """ Opened from main() rather than at import, so parse worker processes that re-import this file stay light """
+    global search_cache, lead_store, dedup, scrapingdog_client, fingerprints
+    # First, so the parse workers are started before any thread is
+    parse_pool.enable()
+    http_client.enable_cache(path=os.path.join("output", "http_cache.sqlite"))
+    search_cache = SearchCache(os.path.join("output", "search_cache.sqlite"))
+    http_client.enable_scheduler()
+    http_client.enable_resolver(path=os.path.join("output", "dead_hosts.sqlite"))
+    lead_store = LeadStore(os.path.join("output", "leads.sqlite"))
+    dedup = DedupIndex(os.path.join("output", "dedup"))
+    scrapingdog_client = ScrapingDogClient(SCRAPING_DOG_API_KEYS,
+                                           CompanyCache(os.path.join("output", "scrapingdog_cache.sqlite")))
+    fingerprints = PageFingerprints(os.path.join("output", "page_fingerprints.sqlite"))
+    parse_pool.use_fingerprints(fingerprints)
+
+def row_emails(row):
+    """ ICP rows keep every address as "a@x.com; b@x.com" """
+    return [e.strip() for e in str(row.get("Emails") or row.get("Contact Email") or "").split(";") if "@" in e]
 
 # ----------------- Option 1: Full ICP Scraper -----------------
-def extract_icp_from_website(domain):
+def extract_icp_from_website(domain, depth=site_crawl.SITE_CRAWL_DEPTH):
     console.print(f"\n Scraping: [bold blue]{domain}[/bold blue]")
     try:
         url = f"https://{domain}"
-        headers = {"User-Agent": "Mozilla/5.0"}
-        res = requests.get(url, headers=headers, timeout=10)
+        deadline = site_crawl.site_deadline()
+        res = http_client.get_page(url, deadline=deadline if depth else None)
         if res.status_code != 200:
             console.print(f"[red] Failed to access site: {domain} (Status {res.status_code})[/red]")
             return []
-        soup = BeautifulSoup(res.text, 'html.parser')
-        text = soup.get_text(separator=" ")
-
-        # title
-        title = soup.title.string.strip() if soup.title else "N/A"
-        meta_desc = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
-        description = meta_desc["content"].strip() if meta_desc and meta_desc.get("content") else ""
-        h1 = soup.find('h1')
-        company_name = h1.get_text(strip=True) if h1 else title
-
-        
-        found_names = NAME_PATTERN.findall(text)
-        contact_person = found_names[0] if found_names else "N/A"
-
-        industry = "N/A"
-        for keyword in INDUSTRY_KEYWORDS:
-            if keyword.lower() in description.lower() or keyword.lower() in text.lower():
-                industry = keyword.capitalize()
-                break
-
-        
-        emails = list(set(re.findall(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+", text)))
-
-       
-        phones_from_text = re.findall(r"\+?\d[\d\s\-().]{7,}", text)
-        phones_from_tel = [a['href'].replace("tel:", "") for a in soup.find_all('a', href=True) if a['href'].startswith("tel:")]
-        all_phones = set()
-        for phone in phones_from_text + phones_from_tel:
-            clean = re.sub(r"[^\d+]", "", phone)
-            if 7 <= len(clean) <= 15:
-                all_phones.add(clean)
-        phones = list(all_phones) if all_phones else []
-
-       
-        whatsapp_links = [a['href'] for a in soup.find_all('a', href=True) if "wa.me" in a['href'] or "whatsapp.com" in a['href']]
-        
-        all_links = [a['href'] for a in soup.find_all('a', href=True)]
-
-        
-        socials = {"LinkedIn": "", "Twitter": "", "Facebook": "", "Instagram": "", "YouTube": ""}
-        for href in all_links:
-            if "linkedin.com" in href:
-                socials["LinkedIn"] = href
-            elif "twitter.com" in href:
-                socials["Twitter"] = href
-            elif "facebook.com" in href:
-                socials["Facebook"] = href
-            elif "instagram.com" in href:
-                socials["Instagram"] = href
-            elif "youtube.com" in href:
-                socials["YouTube"] = href
-
-        
-        contact_page = next((urljoin(url, link) for link in all_links if "contact" in link.lower()), "N/A")
-        careers_page = next((urljoin(url, link) for link in all_links if "career" in link.lower() or "jobs" in link.lower()), "N/A")
-
-        
-        partner_links = [link for link in all_links if any(p in link for p in ['.gov', '.org', '.edu', 'partner', 'ngo', 'ministry'])]
-        partner_links = list(set(partner_links)) if partner_links else []
-
-       
-        address = "N/A"
-        for line in text.split("\n"):
-            if any(word in line.lower() for word in ['address', 'location', 'hq', 'head office']) and len(line) < 150:
-                address = line.strip()
-                break
-
-        
-        html = res.text.lower()
-        tech = []
-        for t in ["wordpress", "shopify", "react", "vue", "django", "laravel", "jquery", "bootstrap"]:
-            if t in html:
-                tech.append(t.capitalize())
-        tech_stack = ", ".join(tech) if tech else "Unknown"
-
-        return [{
-            "Website": domain,
-            "Company Name": company_name,
-            "Contact Person": contact_person,
-            "Industry": industry,
-            "Location": address,
-            "Emails": "; ".join(emails) if emails else "N/A",
-            "Phones": "; ".join(phones) if phones else "N/A",
-            "WhatsApp": "; ".join(whatsapp_links) if whatsapp_links else "N/A",
-            "Contact Page": contact_page,
-            "Careers Page": careers_page,
-            "Tech Stack": tech_stack,
-            "LinkedIn": socials["LinkedIn"] or "N/A",
-            "Twitter": socials["Twitter"] or "N/A",
-            "Facebook": socials["Facebook"] or "N/A",
-            "Instagram": socials["Instagram"] or "N/A",
-            "YouTube": socials["YouTube"] or "N/A",
-            "Gov / Partner Links": "; ".join(partner_links) if partner_links else "N/A"
-        }]
+        if not depth:
+            return [parse_pool.extract_icp_row(domain, url, res)]
+        return [site_crawl.crawl_site(domain, url, res, depth, deadline)]
     except Exception as e:
         console.print(f"[red] Error scraping {domain}: {e}[/red]")
         return []
 
 def save_to_excel(data, filename="Option 4_Full_ICP.xlsx"):
-    
-    output_folder = os.path.join(os.getcwd(), "output")
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
-    
-    filepath = os.path.join(output_folder, filename)
-
-    if not data:
-        console.print("[yellow]⚠️ No data to save.[/yellow]")
-        return
-
-    
-    console.print(f"[blue]Data to be saved (first 3 entries):[/blue] {data[:3]}")
-
-    
-    if os.path.exists(filepath):
-       
-        wb = load_workbook(filepath)
-        ws = wb.active
-    else:
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "ICP Data"
-        
-        
-        headers = [
-            "Website", "Company Name", "Contact Person", "Industry", "Location", "Contact Email", 
-            "Phones", "WhatsApp", "Contact Page", "Careers Page", "Tech Stack", "LinkedIn", 
-            "Twitter", "Facebook", "Instagram", "YouTube", "Gov / Partner Links"
-        ]
-        ws.append(headers)
+    return write_rows(ICP_LAYOUT, data, filename, OUTPUT_FORMAT)
 
-    
-    for row in data:
-        
-        ws.append([
-            row.get("Website", "N/A"),
-            row.get("Company Name", "N/A"),
-            row.get("Contact Person", "N/A"),
-            row.get("Industry", "N/A"),
-            row.get("Location", "N/A"),
-            row.get("Emails", "N/A"),
-            row.get("Phones", "N/A"),
-            row.get("WhatsApp", "N/A"),
-            row.get("Contact Page", "N/A"),
-            row.get("Careers Page", "N/A"),
-            row.get("Tech Stack", "N/A"),
-            row.get("LinkedIn", "N/A"),
-            row.get("Twitter", "N/A"),
-            row.get("Facebook", "N/A"),
-            row.get("Instagram", "N/A"),
-            row.get("YouTube", "N/A"),
-            row.get("Gov / Partner Links", "N/A")
-        ])
-
-    wb.save(filepath)
-    console.print(f"\n [green]Saved to {filepath}[/green]")
 
 # ----------------- Option 4: Multi-Domain Search -----------------
 def multi_domain_search():
@@ -212,14 +99,53 @@ def multi_domain_search():
             domains = file.readlines()
         
         domains = [domain.strip() for domain in domains if domain.strip()] 
-        
-        all_results = []
-        for domain in domains:
-            result = extract_icp_from_website(domain)
-            all_results.extend(result)
-        
-       
-        save_to_excel(all_results, "Option1_Full_ICP_MultiDomain.xlsx")
+
+        dead_hosts = http_client.dead_host_count()
+        if dead_hosts:
+            retry = Prompt.ask(Text(f"{dead_hosts} hosts were unreachable in earlier runs and will be skipped. "
+                                    f"Retry them anyway?", style="bold yellow"), choices=["y", "n"], default="n")
+            if retry == "y":
+                http_client.clear_dead_hosts()
+
+        journal = CrawlJournal(journal_path(file_path))
+        todo = journal.pending(domains)
+        if journal.exists() and todo:
+            resume = Prompt.ask(Text("A previous crawl of this list was interrupted. Resume it?", style="bold yellow"),
+                                choices=["y", "n"], default="y")
+            if resume == "n":
+                journal.reset()
+                todo = domains
+        elif journal.exists():
+            console.print("[cyan]The last crawl of this list finished but was not exported; exporting it now[/cyan]")
+        if len(todo) < len(domains):
+            console.print(f"[cyan]Resuming: {len(domains) - len(todo)} domains already done, {len(todo)} to crawl[/cyan]")
+        # Known domains are re-checked by default: unchanged pages come back as a 304 / fingerprint match
+        skip_known = Prompt.ask(Text("Skip domains already scraped in earlier runs instead of re-checking them?",
+                                     style="bold yellow"), choices=["y", "n"], default="n")
+        if skip_known == "y":
+            fresh = [domain for domain in todo if not dedup.seen_domain(domain)]
+            if len(fresh) < len(todo):
+                console.print(f"[cyan]Skipping {len(todo) - len(fresh)} domains scraped in earlier runs[/cyan]")
+            todo = fresh
+        deep = Prompt.ask(Text("Also crawl each site's contact/about/careers pages?", style="bold yellow"),
+                          choices=["y", "n"], default="y")
+        depth = site_crawl.SITE_CRAWL_DEPTH if deep == "y" else 0
+
+        engine = CrawlEngine(lambda domain: extract_icp_from_website(domain, depth), max_workers=CRAWL_WORKERS,
+                             per_host=CRAWL_PER_HOST, console=console)
+        try:
+            for domain, result in engine.run(todo):
+                journal.record(domain, result)
+                if result:
+                    dedup.add(domains=[domain], emails=[e for row in result for e in row_emails(row)])
+        finally:
+            journal.close()
+
+        stats = engine.stats
+        console.print(f"\n[bold green]Crawled {stats.done} domains in {time.monotonic() - stats.started_at:.1f}s "
+                      f"({stats.rate():.2f} domains/sec, {stats.failed} failed)[/bold green]")
+        save_to_excel(lead_store.tee("option4", journal.rows()), "Option1_Full_ICP_MultiDomain.xlsx")
+        journal.finish()
     else:
         console.print("[red]No file selected![/red]")
 
@@ -245,7 +171,7 @@ def google_search(query, start=0, num_results=100):
         "start": start,
         "num": num_results
     }
-    res = requests.get(url, params=params)
+    res = http_client.get(url, params=params, timeout=API_TIMEOUT, use_cache=False)
     return res.json().get("organic_results", []) if res.status_code == 200 else []
 
 def linkedin_search(query, start=0, num_results=100):
@@ -257,22 +183,51 @@ def linkedin_search(query, start=0, num_results=100):
         "start": start,
         "num": num_results
     }
-    res = requests.get(url, params=params)
+    res = http_client.get(url, params=params, timeout=API_TIMEOUT, use_cache=False)
     return res.json().get("organic_results", []) if res.status_code == 200 else []
 
+def general_search(query, sink, skip_known=False):
+    """
+    Google + LinkedIn search for Option 2. Results stream into the enrichment
+    stage and finished leads are passed to sink(leads) in batches as they complete.
+    With skip_known, URLs scraped in earlier runs are left out instead of re-checked.
+    """
+    seen_urls = set()
+    fetchers = {"google": google_search, "linkedin": linkedin_search}
+    stats = SearchStats(len(fetchers))
+    def record(leads):
+        lead_store.add("option2", leads)
+        dedup.add(urls=[lead["Website/URL"] for lead in leads],
+                  emails=[e for lead in leads for e in row_emails(lead)])
+        sink(leads)
+
+    stage = EnrichmentStage(enrich_result, record)
+
+    try:
+        for results in search_engines(fetchers, query, search_cache, stats):
+            for r in results:
+                url = r.get("link")
+                if url and url not in seen_urls:
+                    seen_urls.add(url)
+                    if skip_known and dedup.seen_url(url):
+                        continue
+                    stage.put(r)
+    finally:
+        leads = stage.close()
+
+    console.print(f"[cyan]{stats.summary()}[/cyan]")
+    if stage.failed or stage.unsaved:
+        console.print(f"[red]Enrichment: {stage.failed} results failed, {stage.unsaved} leads could not be written[/red]")
+    with_contact_info = [lead for lead in leads if lead["Contact Email"] or lead["Phone"]]
+    without_contact_info = [lead for lead in leads if not (lead["Contact Email"] or lead["Phone"])]
+    return with_contact_info, without_contact_info
+
 def extract_contact_info(url):
     email = ""
     phone = ""
     company_url = ""
     try:
-        headers = {"User-Agent": "Mozilla/5.0"}
-        html = requests.get(url, headers=headers, timeout=10).text
-        soup = BeautifulSoup(html, "html.parser")
-        text = soup.get_text()
-        email_match = re.findall(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+", text)
-        phone_match = re.findall(r"\+?\d[\d -]{7,}\d", text)
-        email = email_match[0] if email_match else ""
-        phone = phone_match[0] if phone_match else ""
+        email, phone = parse_pool.extract_page_contacts(urlparse(url).netloc, url, http_client.get_page(url))
         company_url = url
     except Exception as e:
         console.print(f" Contact info extraction failed from {url}: {e}")
@@ -309,10 +264,10 @@ def extract_info_from_result(result):
 
     return company_name, location, industry, company_size, tech_stack, link
 
-def process_result2(result, with_contact_info, without_contact_info):
+def enrich_result(result):
     company_name, location, industry, company_size, tech_stack, link = extract_info_from_result(result)
     email, phone, company_url = extract_contact_info(link)
-    lead = {
+    return {
         "Company Name": company_name,
         "Contact Person": "",  
         "Industry": industry,  
@@ -323,76 +278,48 @@ def process_result2(result, with_contact_info, without_contact_info):
         "Contact Email": email,
         "Phone": phone
     }
-    if email or phone:
-        with_contact_info.append(lead)
-    else:
-        without_contact_info.append(lead)
 
 def save_to_excel2(data, filename="Option2_General_ICP.xlsx"):
-    
-    output_folder = os.path.join(os.getcwd(), "output")
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
-    filepath = os.path.join(output_folder, filename)
-
-    if not data:
-        console.print("[yellow]⚠️ No data to save.[/yellow]")
-        return
-
-    console.print(f"[blue]Data to be saved (first 3 entries):[/blue] {data[:3]}")
+    return write_rows(GENERAL_LAYOUT, data, filename, OUTPUT_FORMAT)
 
-    
-    if os.path.exists(filepath):
-        
-        wb = load_workbook(filepath)
-        ws = wb.active
+# ----------------- Option 3: ScrapingDog LinkedIn API -----------------
+def scrapingdog_linkedin_search(linkedin_url):
+    try:
+        return scrapingdog_client.fetch_company(linkedin_url)
+    except QuotaExhausted as e:
+        console.print(f"[red]{e}[/red]")
+        return iter(())
+
+def scrapingdog_batch_search(source):
+    """ Option 3 batch mode: every LinkedIn company URL from a file or from the lead store """
+    if source == "file":
+        root = tk.Tk()
+        root.withdraw()
+        file_path = filedialog.askopenfilename(title="Select LinkedIn URL File", filetypes=[("Text files", "*.txt")])
+        if not file_path:
+            console.print("[red]No file selected![/red]")
+            return
+        with open(file_path, 'r') as file:
+            urls = [line.strip() for line in file if "linkedin.com/company/" in line]
     else:
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "ICP Data"
-        
-       
-        headers = [
-            "Company Name", "Contact Person", "Industry", "Website/URL", "Location", "Company Size", "Tech Stack", 
-            "Contact Email", "Phone"
-        ]
-        ws.append(headers)
+        urls = lead_store.linkedin_urls()
+    if not urls:
+        console.print("[yellow]No LinkedIn company URLs found.[/yellow]")
+        return
 
-    
-    for row in data:
-        ws.append([
-            row.get("Company Name", "N/A"),
-            row.get("Contact Person", "N/A"),
-            row.get("Industry", "N/A"),
-            row.get("Website/URL", "N/A"),
-            row.get("Location", "N/A"),
-            row.get("Company Size", "N/A"),
-            row.get("Tech Stack", "N/A"),
-            row.get("Contact Email", "N/A"),
-            row.get("Phone", "N/A")
-        ])
-
-    wb.save(filepath)
-    console.print(f"\n💾 [green]Saved to {filepath}[/green]")
+    console.print(f"\n Enriching [bold blue]{len(urls)}[/bold blue] LinkedIn companies")
+    with OutputSink(SCRAPINGDOG_LAYOUT, "Option3_ScrapingDog_Batch.xlsx", OUTPUT_FORMAT) as sink:
+        def record(leads):
+            lead_store.add("option3", leads)
+            sink.write(leads)
 
-# ----------------- Option 3: ScrapingDog LinkedIn API -----------------
-def scrapingdog_linkedin_search(linkedin_url):
-    url = "https://api.scrapingdog.com/linkedin"
-    company_id = linkedin_url.split("linkedin.com/company/")[-1]
-    params = {
-        "api_key": SCRAPING_DOG_API_KEY,
-        "type": "company",
-        "linkId": company_id,
-        "private": "false"
-    }
-    res = requests.get(url, params=params)
-    return res.json() if res.status_code == 200 else []
+        rows = enrich_batch(scrapingdog_client, urls, process_scrapingdog_data, record)
+    console.print(f"[green]{rows} rows from {len(urls)} companies[/green]")
 
 def process_scrapingdog_data(data):
+    """ data: the companies fetch_company yields (or a list of them) """
     with_info, without_info = [], []
-    if isinstance(data, list):
+    if data is not None:
         for company in data:
             lead = {
                 "Company Name": company.get("company_name", ""),
@@ -416,58 +343,8 @@ def process_scrapingdog_data(data):
     return with_info, without_info
 
 def save_to_excel3(data, filename="TechMantra_Global_ICP.xlsx"):
-    
-    output_folder = os.path.join(os.getcwd(), "output")
-    if not os.path.exists(output_folder):
-        os.makedirs(output_folder)
-
-    filepath = os.path.join(output_folder, filename)
-
-    if not data:
-        console.print("[yellow]⚠️ No data to save.[/yellow]")
-        return
-
-    console.print(f"[blue]Data to be saved (first 3 entries):[/blue] {data[:3]}")
-
-    
-    if os.path.exists(filepath):
-       
-        wb = load_workbook(filepath)
-        ws = wb.active
-    else:
-        
-        wb = Workbook()
-        ws = wb.active
-        ws.title = "ICP Data"
-        
-        
-        headers = [
-            "Company Name", "Contact Person", "Industry", "Website/URL", "Location", "Company Size", "Tech Stack", 
-            "Contact Email", "Phone", "Employees", "Employee Positions", "Profiles", "Updates", "Similar Companies"
-        ]
-        ws.append(headers)
+    return write_rows(SCRAPINGDOG_LAYOUT, data, filename, OUTPUT_FORMAT)
 
-    
-    for row in data:
-        ws.append([
-            row.get("Company Name", "N/A"),
-            row.get("Contact Person", "N/A"),
-            row.get("Industry", "N/A"),
-            row.get("Website/URL", "N/A"),
-            row.get("Location", "N/A"),
-            row.get("Company Size", "N/A"),
-            row.get("Tech Stack", "N/A"),
-            row.get("Contact Email", "N/A"),
-            row.get("Phone", "N/A"),
-            row.get("Employees", "N/A"),
-            row.get("Employee Positions", "N/A"),
-            row.get("Profiles", "N/A"),
-            row.get("Updates", "N/A"),
-            row.get("Similar Companies", "N/A")
-        ])
-
-    wb.save(filepath)
-    console.print(f"\n [green]Saved to {filepath}[/green]")
 
 # ----------------- User Input Handler -----------------
 def get_user_input():
@@ -497,32 +374,16 @@ def scrape_icp_data():
         result = extract_icp_from_website(website)
         all_results.extend(result)
         
+        lead_store.add("option1", all_results)
         save_to_excel(all_results, "Option1_Full_ICP.xlsx")
     elif choice == "2":
         industry, location, company_size, tech_stack = inputs
         query = build_query(industry, location, company_size, tech_stack, "", choice)
-        with_contact_info = []
-        without_contact_info = []
-        seen_urls = set()
-
-        with ThreadPoolExecutor(max_workers=5) as executor:
-            futures = []
-            for start in range(0, 100, 10):  # 2 pages
-                futures.append(executor.submit(google_search, query, start))
-                futures.append(executor.submit(linkedin_search, query, start))
-                
-            for future in as_completed(futures):
-                results = future.result()
-                for r in results:
-                    url = r.get("link")
-                    if url and url not in seen_urls:
-                        seen_urls.add(url)
-                        process_result2(r, with_contact_info, without_contact_info)
-        
+        with OutputSink(GENERAL_LAYOUT, "Option2_General_ICP.xlsx", OUTPUT_FORMAT) as sink:
+            with_contact_info, without_contact_info = general_search(query, sink.write)
+
         all_results.extend(with_contact_info)
         all_results.extend(without_contact_info)
-        
-        save_to_excel2(all_results, "Option2_General_ICP.xlsx")
     elif choice == "3":
         linkedin_url = inputs[0]
         data = scrapingdog_linkedin_search(linkedin_url)
@@ -530,10 +391,20 @@ def scrape_icp_data():
         all_results.extend(with_info)
         all_results.extend(without_info)
         
+        lead_store.add("option3", all_results)
         save_to_excel3(all_results, "Option3_ScrapingDog_ICP.xlsx")
 
 # ----------------- Main Runner -----------------
 def main():
+    open_stores()
+    try:
+        menu()
+    finally:
+        # On every way out (Exit, Ctrl-C, an error), or the next start rebuilds the Bloom filter
+        dedup.close()
+        parse_pool.close()
+
+def menu():
     while True:  # 
         
         console.print(
@@ -565,6 +436,7 @@ def main():
             console.print("\n[bold blue]You chose: Specific Website (No API)[/bold blue]")
             website = Prompt.ask(Text("Enter the specific website to scrape (e.g., example.com):", style="bold yellow"))
             result = extract_icp_from_website(website)
+            lead_store.add("option1", result)
             save_to_excel(result, "Option1_Full_ICP.xlsx")
         
         elif choice == "2":
@@ -575,34 +447,27 @@ def main():
             tech_stack = Prompt.ask(Text("Technology/Stack (e.g., Python, Django):", style="bold yellow"))
             
             query = build_query(industry, location, company_size, tech_stack, "", choice)
-            with_contact_info = []
-            without_contact_info = []
-            seen_urls = set()
-
-            with ThreadPoolExecutor(max_workers=5) as executor:
-                futures = []
-                for start in range(0, 100, 10):  #2 pages
-                    futures.append(executor.submit(google_search, query, start))
-                    futures.append(executor.submit(linkedin_search, query, start))
-
-                for future in as_completed(futures):
-                    results = future.result()
-                    for r in results:
-                        url = r.get("link")
-                        if url and url not in seen_urls:
-                            seen_urls.add(url)
-                            process_result2(r, with_contact_info, without_contact_info)
-
-            result = with_contact_info + without_contact_info
-            save_to_excel2(result, "Option2_General_ICP.xlsx")
+            # Same default as Option 4: known pages are re-checked through the conditional GET / fingerprint path
+            skip_known = Prompt.ask(Text("Skip results already scraped in earlier runs instead of re-checking them?",
+                                         style="bold yellow"), choices=["y", "n"], default="n")
+            with OutputSink(GENERAL_LAYOUT, "Option2_General_ICP.xlsx", OUTPUT_FORMAT) as sink:
+                with_contact_info, without_contact_info = general_search(query, sink.write, skip_known == "y")
+            console.print(f"[green]{len(with_contact_info)} leads with contact info, "
+                          f"{len(without_contact_info)} without[/green]")
         
         elif choice == "3":
             console.print("\n[bold blue]You chose: Full LinkedIn Company Details (ScrapingDog API)[/bold blue]")
-            linkedin_url = Prompt.ask(Text("Enter LinkedIn company URL:", style="bold yellow"))
-            data = scrapingdog_linkedin_search(linkedin_url)
-            with_info, without_info = process_scrapingdog_data(data)
-            result = with_info + without_info
-            save_to_excel3(result, "Option3_ScrapingDog_ICP.xlsx")
+            source = Prompt.ask(Text("One company URL, a file of URLs, or every LinkedIn URL in the lead store?",
+                                     style="bold yellow"), choices=["url", "file", "store"], default="url")
+            if source == "url":
+                linkedin_url = Prompt.ask(Text("Enter LinkedIn company URL:", style="bold yellow"))
+                data = scrapingdog_linkedin_search(linkedin_url)
+                with_info, without_info = process_scrapingdog_data(data)
+                result = with_info + without_info
+                lead_store.add("option3", result)
+                save_to_excel3(result, "Option3_ScrapingDog_ICP.xlsx")
+            else:
+                scrapingdog_batch_search(source)
         
         elif choice == "4":
             console.print("\n[bold blue]You chose: Multi-Domain Search (No API)[/bold blue]")
@@ -616,6 +481,20 @@ def main():
             console.print("\n[bold red]Invalid option! Please choose a valid option (1, 2, 3, 4, or 5).[/bold red]")
             continue
 
+        console.print(f"[cyan]{http_client.cache_summary(reset=True)}[/cyan]")
+        console.print(f"[cyan]{http_client.download_summary(reset=True)}[/cyan]")
+        console.print(f"[cyan]{http_client.resolver_summary(reset=True)}[/cyan]")
+        console.print(f"[cyan]{dedup.stats.summary()}[/cyan]")
+        dedup.stats.reset()
+        if scrapingdog_client.stats.companies:
+            console.print(f"[cyan]{scrapingdog_client.stats.summary()}[/cyan]")
+            scrapingdog_client.stats.reset()
+        console.print(f"[cyan]{fingerprints.stats.summary()}[/cyan]")
+        fingerprints.stats.reset()
+        if site_crawl.stats.sites:
+            console.print(f"[cyan]{site_crawl.stats.summary()}[/cyan]")
+            site_crawl.stats.reset()
+
 if __name__ == "__main__":
     main()
 
@@ -0,0 +1,321 @@
+import hashlib
+import json
+import os
+import random
+import socket
+import sqlite3
+import threading
+import time
+import requests
+import urllib3
+from rich.console import Console
+import http_client
+from worker_stage import WorkerStage
+from scheduler import RobotsDisallowed
+
+try:
+    import ijson
+except ImportError:  # listed in requirements.txt; without it payloads are loaded whole, then capped
+    ijson = None
+
+# ScrapingDog LinkedIn company lookups for Option 3, single or in batches.
+# Company payloads are cached on disk, every API key has a daily call
+# quota (keys are rotated when one runs out), and 429/5xx answers are
+# retried with exponential backoff. The request rate itself is set by the
+# api.scrapingdog.com bucket in scheduler.API_QUOTAS.
+SCRAPINGDOG_URL = "https://api.scrapingdog.com/linkedin"
+COMPANY_CACHE_PATH = "output/scrapingdog_cache.sqlite"
+COMPANY_CACHE_TTL_SECONDS = 30 * 24 * 3600
+KEY_DAILY_QUOTA = 1000
+BATCH_WORKERS = 8
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+MAX_RETRIES = 5
+BACKOFF_SECONDS = 1.0
+BACKOFF_MAX_SECONDS = 60.0
+API_TIMEOUT = 30
+# Per-company caps, applied while the payload is parsed, so a company with
+# thousands of employees costs no more memory than one with fifty
+MAX_EMPLOYEES = 50
+MAX_UPDATES = 20
+CAPPED_LISTS = {"employees": MAX_EMPLOYEES, "updates": MAX_UPDATES}
+# Errors that prove the request never left this machine; only those are not
+# charged to the key. A connection that drops after the request went out may
+# still have been billed, so it is charged.
+NOT_SENT_ERRORS = (RobotsDisallowed, requests.exceptions.ConnectTimeout)
+# ... and connection errors caused by one of these (failed DNS lookup, refused connection)
+NOT_CONNECTED_CAUSES = (urllib3.exceptions.NewConnectionError, socket.gaierror, ConnectionRefusedError)
+
+console = Console()
+
+
+class QuotaExhausted(Exception):
+    pass
+
+
+def company_id(linkedin_url):
+    """ "https://www.linkedin.com/company/acme/about/?x=1" -> "acme" """
+    tail = linkedin_url.strip().split("linkedin.com/company/")[-1]
+    return tail.split("?")[0].split("#")[0].strip("/").split("/")[0]
+
+
+def key_id(api_key):
+    """ Keys are never written to disk, only a short digest of them """
+    return hashlib.sha1(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def _redact(error, api_key):
+    """ Error text without the key (request errors quote the full URL) """
+    return str(error).replace(api_key, key_id(api_key) + "...")
+
+
+def was_not_sent(error):
+    """ True if error proves the request was never sent (see NOT_SENT_ERRORS) """
+    if isinstance(error, NOT_SENT_ERRORS):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError):
+        return False
+    seen, stack = set(), [error]
+    while stack:
+        err = stack.pop()
+        if not isinstance(err, BaseException) or id(err) in seen:
+            continue
+        seen.add(id(err))
+        if isinstance(err, NOT_CONNECTED_CAUSES):
+            return True
+        stack.extend([getattr(err, "reason", None), err.__cause__, err.__context__, *err.args])
+    return False
+
+
+def cap_company(company, caps=CAPPED_LISTS):
+    for key, cap in caps.items():
+        if isinstance(company.get(key), list):
+            del company[key][cap:]
+    return company
+
+
+def iter_companies(stream, caps=CAPPED_LISTS):
+    """
+    Companies from a ScrapingDog payload (a JSON list) read incrementally
+    with ijson. Items past the cap in each capped list are skipped by the
+    parser and never built.
+    """
+    capped = {f"item.{key}.item": cap for key, cap in caps.items()}
+    counts, builder, skip_depth = {}, None, 0
+    for prefix, event, value in ijson.parse(stream, use_float=True):
+        if skip_depth:
+            if event in ("start_map", "start_array"):
+                skip_depth += 1
+            elif event in ("end_map", "end_array"):
+                skip_depth -= 1
+            continue
+        if builder is None:
+            if prefix == "item" and event == "start_map":
+                builder, counts = ijson.ObjectBuilder(), {}
+                builder.event(event, value)
+            continue
+        if prefix in capped and event not in ("map_key", "end_map", "end_array"):
+            counts[prefix] = counts.get(prefix, 0) + 1
+            if counts[prefix] > capped[prefix]:
+                if event in ("start_map", "start_array"):
+                    skip_depth = 1
+                continue
+        builder.event(event, value)
+        if prefix == "item" and event == "end_map":
+            yield builder.value
+            builder = None
+
+
+def read_payload(res):
+    """ Capped companies from a 200 response, one at a time (parsed incrementally with ijson) """
+    if ijson is None:
+        data = res.json()
+        return (cap_company(company) for company in data) if isinstance(data, list) else iter(())
+    res.raw.decode_content = True
+    return iter_companies(res.raw)
+
+
+class BatchStats:
+    FIELDS = ("companies", "from_cache", "api_calls", "retries", "failed", "quota_skipped")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"ScrapingDog: {self.companies} companies, {self.from_cache} from cache, "
+                f"{self.api_calls} API calls, {self.retries} retries, {self.failed} failed, "
+                f"{self.quota_skipped} skipped (key quota used up)")
+
+
+class CompanyCache:
+    """ Company payloads by LinkedIn company id, plus per-key daily call counts """
+
+    def __init__(self, path=COMPANY_CACHE_PATH, ttl=COMPANY_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS companies (
+                link_id TEXT PRIMARY KEY, payload TEXT, fetched_at REAL);
+            CREATE TABLE IF NOT EXISTS key_usage (
+                key_id TEXT, day TEXT, calls INTEGER, PRIMARY KEY (key_id, day));
+        """)
+        self._db.commit()
+
+    def get(self, link_id):
+        with self._lock:
+            row = self._db.execute("SELECT payload, fetched_at FROM companies WHERE link_id = ?",
+                                   (link_id.lower(),)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, link_id, payload):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO companies VALUES (?, ?, ?)",
+                             (link_id.lower(), json.dumps(payload), time.time()))
+            self._db.commit()
+
+    def take_call(self, keys, quota):
+        """ First key with calls left today; the call is counted before it is made """
+        day = time.strftime("%Y-%m-%d")
+        with self._lock:
+            for api_key in keys:
+                kid = key_id(api_key)
+                row = self._db.execute("SELECT calls FROM key_usage WHERE key_id = ? AND day = ?",
+                                       (kid, day)).fetchone()
+                if (row[0] if row else 0) < quota:
+                    self._db.execute("""INSERT INTO key_usage VALUES (?, ?, 1)
+                                        ON CONFLICT (key_id, day) DO UPDATE SET calls = calls + 1""", (kid, day))
+                    self._db.commit()
+                    return api_key
+        raise QuotaExhausted(f"all {len(keys)} ScrapingDog keys have used their {quota} calls for {day}")
+
+    def refund_call(self, api_key):
+        """ Give back a call that take_call counted but that never reached the API """
+        with self._lock:
+            self._db.execute("UPDATE key_usage SET calls = MAX(0, calls - 1) WHERE key_id = ? AND day = ?",
+                             (key_id(api_key), time.strftime("%Y-%m-%d")))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+class ScrapingDogClient:
+    def __init__(self, api_keys, cache, quota=KEY_DAILY_QUOTA, timeout=API_TIMEOUT):
+        self.api_keys = [api_keys] if isinstance(api_keys, str) else list(api_keys)
+        self.cache = cache
+        self.quota = quota
+        self.timeout = timeout
+        self.stats = BatchStats()
+
+    def _backoff(self, attempt, retry_after=None):
+        delay = min(BACKOFF_MAX_SECONDS, BACKOFF_SECONDS * 2 ** attempt)
+        if retry_after and str(retry_after).isdigit():
+            delay = max(delay, float(retry_after))
+        time.sleep(delay * random.uniform(0.8, 1.2))
+
+    def _stream(self, link_id, res):
+        """ Companies as they are parsed; the capped companies are cached once the payload is read through """
+        companies = []
+        try:
+            for company in read_payload(res):
+                companies.append(company)
+                yield company
+        except Exception as e:
+            self.stats.add(failed=1)
+            console.print(f"[red]ScrapingDog payload for {link_id} could not be read: {e}[/red]")
+            return
+        finally:
+            res.close()
+        if companies:
+            # An empty answer is not cached: it may be an outage, not a missing company
+            self.cache.put(link_id, companies)
+
+    def fetch_company(self, linkedin_url):
+        """
+        Iterator over the companies in the payload (ScrapingDog returns a
+        list), streamed from the response; empty on failure
+        """
+        link_id = company_id(linkedin_url)
+        self.stats.add(companies=1)
+        cached = self.cache.get(link_id)
+        if cached is not None:
+            self.stats.add(from_cache=1)
+            return (cap_company(company) for company in cached) if isinstance(cached, list) else iter(())
+        for attempt in range(MAX_RETRIES + 1):
+            api_key = self.cache.take_call(self.api_keys, self.quota)
+            params = {
+                "api_key": api_key,
+                "type": "company",
+                "linkId": link_id,
+                "private": "false"
+            }
+            retry_after = None
+            try:
+                res = http_client.get_stream(SCRAPINGDOG_URL, params=params, timeout=self.timeout)
+            except Exception as e:
+                if was_not_sent(e):
+                    self.cache.refund_call(api_key)
+                    console.print(f"[red]ScrapingDog request for {link_id} was not sent: {_redact(e, api_key)}[/red]")
+                else:
+                    self.stats.add(api_calls=1)
+                    console.print(f"[red]ScrapingDog request for {link_id} failed: {_redact(e, api_key)}[/red]")
+            else:
+                self.stats.add(api_calls=1)
+                if res.status_code == 200:
+                    return self._stream(link_id, res)
+                retry_after = res.headers.get("Retry-After")
+                res.close()
+                if res.status_code not in RETRY_STATUSES:
+                    console.print(f"[red]ScrapingDog returned HTTP {res.status_code} for {link_id}[/red]")
+                    break
+            if attempt < MAX_RETRIES:
+                self.stats.add(retries=1)
+                self._backoff(attempt, retry_after)
+        self.stats.add(failed=1)
+        return iter(())
+
+
+def enrich_batch(client, linkedin_urls, process, sink, workers=BATCH_WORKERS):
+    """
+    Look up every company concurrently; `process(payload)` turns a payload
+    into (with_info, without_info) rows, which reach `sink(rows)` in batches
+    as they finish. Returns the number of rows written.
+    """
+    def enrich(linkedin_url):
+        try:
+            with_info, without_info = process(client.fetch_company(linkedin_url))
+        except QuotaExhausted:
+            client.stats.add(quota_skipped=1)
+            return None
+        except Exception:
+            client.stats.add(failed=1)
+            return None
+        return with_info + without_info
+
+    stage = WorkerStage(enrich, sink, workers=workers, keep_results=False, name="ScrapingDog lookup")
+    seen = set()
+    try:
+        for linkedin_url in linkedin_urls:
+            link_id = company_id(linkedin_url).lower()
+            if link_id and link_id not in seen:
+                seen.add(link_id)
+                stage.put(linkedin_url)
+    finally:
+        stage.close()
+    return stage.count
@@ -0,0 +1,117 @@
+import json
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Search subsystem for Option 2. SerpAPI pages are cached per
+# (engine, query, start, num) with an expiry, and each engine is paged
+# only while it keeps returning full pages of new links.
+SEARCH_CACHE_PATH = "output/search_cache.sqlite"
+SEARCH_CACHE_TTL_SECONDS = 7 * 24 * 3600
+SEARCH_PAGE_SIZE = 100
+SEARCH_MAX_RESULTS = 200
+# What the old fixed loop submitted: every start in range(0, 100, 10) per engine
+LEGACY_CALLS_PER_ENGINE = 10
+
+
+class SearchStats:
+    def __init__(self, engines):
+        self.planned_calls = LEGACY_CALLS_PER_ENGINE * engines
+        self.api_calls = 0
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+
+    def add(self, api_calls=0, cache_hits=0):
+        with self._lock:
+            self.api_calls += api_calls
+            self.cache_hits += cache_hits
+
+    def summary(self):
+        saved = self.planned_calls - self.api_calls
+        return (f"Search: {self.api_calls} API calls, {self.cache_hits} pages from cache, "
+                f"{saved} of {self.planned_calls} calls saved")
+
+
+class SearchCache:
+    def __init__(self, path=SEARCH_CACHE_PATH, ttl=SEARCH_CACHE_TTL_SECONDS):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS search_pages (
+                engine TEXT, query TEXT, start INTEGER, num INTEGER,
+                results TEXT, fetched_at REAL,
+                PRIMARY KEY (engine, query, start, num)
+            )""")
+        self._db.commit()
+
+    def get(self, engine, query, start, num):
+        with self._lock:
+            row = self._db.execute(
+                "SELECT results, fetched_at FROM search_pages WHERE engine = ? AND query = ? AND start = ? AND num = ?",
+                (engine, query, start, num)).fetchone()
+        if row is None or time.time() - row[1] >= self.ttl:
+            return None
+        return json.loads(row[0])
+
+    def put(self, engine, query, start, num, results):
+        with self._lock:
+            self._db.execute("INSERT OR REPLACE INTO search_pages VALUES (?, ?, ?, ?, ?, ?)",
+                             (engine, query, start, num, json.dumps(results), time.time()))
+            self._db.commit()
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def paginate(engine, fetch, query, cache, stats, page_size=SEARCH_PAGE_SIZE, max_results=SEARCH_MAX_RESULTS):
+    """ Yield result pages for one engine, stopping once pages come back short or add no new links """
+    seen = set()
+    for start in range(0, max_results, page_size):
+        results = cache.get(engine, query, start, page_size)
+        if results is None:
+            results = fetch(query, start, page_size)
+            stats.add(api_calls=1)
+            if results:
+                cache.put(engine, query, start, page_size, results)
+        else:
+            stats.add(cache_hits=1)
+
+        links = {r.get("link") for r in results if r.get("link")}
+        new_links = links - seen
+        seen |= links
+        if results:
+            yield results
+        if len(results) < page_size or not new_links:
+            break
+
+
+def search_engines(fetchers, query, cache, stats, page_size=SEARCH_PAGE_SIZE, max_results=SEARCH_MAX_RESULTS):
+    """
+    Page every engine in {name: fetch(query, start, num)} in parallel and
+    yield result pages as soon as any engine returns one.
+    """
+    pages = queue.Queue()
+    done = object()
+
+    def collect(engine, fetch):
+        try:
+            for page in paginate(engine, fetch, query, cache, stats, page_size, max_results):
+                pages.put(page)
+        finally:
+            pages.put(done)
+
+    with ThreadPoolExecutor(max_workers=len(fetchers)) as executor:
+        futures = [executor.submit(collect, engine, fetch) for engine, fetch in fetchers.items()]
+        remaining = len(futures)
+        while remaining:
+            page = pages.get()
+            if page is done:
+                remaining -= 1
+            else:
+                yield page
+        for future in futures:
+            future.result()
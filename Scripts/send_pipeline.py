@@ -0,0 +1,280 @@
+import os
+import random
+import smtplib
+import sqlite3
+import threading
+import time
+from rich.console import Console
+from rich.live import Live
+from rich.text import Text
+from worker_stage import WorkerStage
+from scheduler import TokenBucket
+from smtp_pool import CONNECTION_ERRORS
+
+# Rate-limited send pipeline for the email campaign. Worker threads take
+# messages from a bounded queue and send them over the SMTP pool; every send
+# needs a token from a messages/sec bucket and a slot in the sender's
+# messages/day quota (counted on disk, so it holds across runs). Temporary
+# SMTP errors (421, 451 ... any 4xx, or a dropped connection) slow the whole
+# pipeline down and the message is retried with jittered backoff; 5xx
+# answers about a message fail it straight away. Errors about the session
+# rather than the message (a refused login, or a server that stays
+# unreachable through the retries) stop the pipeline instead, so the
+# messages not sent yet stay queued for the next run.
+SEND_RATE = 2.0              # messages/sec
+SEND_BURST = 5
+SEND_DAILY_LIMIT = 2000      # Google Workspace allows 2000/day, a free Gmail account 500
+SEND_QUEUE_SIZE = 64
+SEND_FLUSH_EVERY = 25        # sent addresses are marked contacted in batches of this size
+SEND_QUOTA_PATH = "output/send_quota.sqlite"
+MAX_SEND_RETRIES = 4
+RETRY_BACKOFF_SECONDS = 2.0
+RETRY_BACKOFF_MAX_SECONDS = 120.0
+# After a temporary error the send rate is divided by this (and restored slowly on success)
+THROTTLE_FACTOR = 2.0
+MIN_SEND_RATE = 0.05
+SEND_REFRESH_SECONDS = 0.25
+DAILY_LIMIT_REASON = "daily limit reached"
+
+
+class DailyLimitReached(Exception):
+    pass
+
+
+def smtp_code(error):
+    """ SMTP reply code behind an smtplib error, or None """
+    if isinstance(error, smtplib.SMTPRecipientsRefused):
+        codes = [code for code, _ in error.recipients.values()]
+        return max(codes) if codes else None
+    return getattr(error, "smtp_code", None)
+
+
+def is_temporary(error):
+    """ 4xx replies and dropped connections are worth retrying; 5xx replies are not """
+    if isinstance(error, smtplib.SMTPAuthenticationError):
+        return False
+    if isinstance(error, CONNECTION_ERRORS):
+        return True
+    code = smtp_code(error)
+    return code is not None and 400 <= code < 500
+
+
+def is_session_error(error):
+    """ Errors no message can get past: they stop sending instead of failing messages one by one """
+    return isinstance(error, (smtplib.SMTPAuthenticationError,) + CONNECTION_ERRORS)
+
+
+class SendLimiter:
+    """ messages/sec token bucket plus a per-sender messages/day quota """
+
+    def __init__(self, sender, rate=SEND_RATE, burst=SEND_BURST, daily_limit=SEND_DAILY_LIMIT,
+                 path=SEND_QUOTA_PATH):
+        self.sender = sender.lower()
+        self.daily_limit = daily_limit
+        self.throttled = 0
+        self._bucket = TokenBucket(rate, burst)
+        self._cond = threading.Condition()
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS daily_sends (
+                sender TEXT, day TEXT, sent INTEGER, PRIMARY KEY (sender, day)
+            )""")
+        self._db.commit()
+
+    @property
+    def rate(self):
+        return self._bucket.rate
+
+    def sent_today(self):
+        with self._cond:
+            row = self._db.execute("SELECT sent FROM daily_sends WHERE sender = ? AND day = ?",
+                                   (self.sender, time.strftime("%Y-%m-%d"))).fetchone()
+        return row[0] if row else 0
+
+    def acquire(self):
+        """ Block until a message may be sent; the day's quota is counted before the send """
+        with self._cond:
+            while True:
+                day = time.strftime("%Y-%m-%d")
+                if self.sent_today() >= self.daily_limit:
+                    raise DailyLimitReached(f"{self.sender} has sent its {self.daily_limit} messages for {day}")
+                now = time.monotonic()
+                wait = self._bucket.wait_time(now)
+                if wait <= 0:
+                    self._bucket.take(now)
+                    break
+                self._cond.wait(timeout=wait)
+            self._db.execute("""INSERT INTO daily_sends VALUES (?, ?, 1)
+                                ON CONFLICT (sender, day) DO UPDATE SET sent = sent + 1""", (self.sender, day))
+            self._db.commit()
+
+    def refund(self):
+        """ A message that was not sent after all does not count against today's quota """
+        with self._cond:
+            self._db.execute("UPDATE daily_sends SET sent = MAX(0, sent - 1) WHERE sender = ? AND day = ?",
+                             (self.sender, time.strftime("%Y-%m-%d")))
+            self._db.commit()
+
+    def feedback(self, temporary_error):
+        """ Slow down after a temporary error, recover gradually on success """
+        with self._cond:
+            bucket = self._bucket
+            if temporary_error:
+                self.throttled += 1
+                bucket.rate = max(MIN_SEND_RATE, bucket.rate / THROTTLE_FACTOR)
+                bucket.paused_until = time.monotonic() + 1.0 / bucket.rate
+            elif bucket.rate < bucket.base_rate:
+                bucket.rate = min(bucket.base_rate, bucket.rate * 1.1)
+            self._cond.notify_all()
+
+    def close(self):
+        with self._cond:
+            self._db.close()
+
+
+class SendStats:
+    """ Thread-safe counters behind the live send readout """
+    FIELDS = ("sent", "failed", "retried", "queued", "skipped")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+            self.started_at = time.monotonic()
+            self.stopped = None     # why sending stopped early, if it did
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def rate(self):
+        elapsed = time.monotonic() - self.started_at
+        return self.sent / elapsed if elapsed > 0 else 0.0
+
+    def render(self, limiter=None):
+        line = (f"[bold green]Sent {self.sent}[/bold green]  "
+                f"[red]failed: {self.failed}[/red]  "
+                f"[yellow]queued: {self.queued}[/yellow]  "
+                f"[cyan]{self.rate():.2f} msgs/sec[/cyan]  "
+                f"retries: {self.retried}")
+        if limiter is not None:
+            line += f"  [magenta]limit: {limiter.rate:.2f} msgs/sec, throttled {limiter.throttled}x[/magenta]"
+        if self.skipped:
+            line += f"  [bold red]{self.stopped}, {self.skipped} left queued[/bold red]"
+        return Text.from_markup(line)
+
+
+class SendPipeline:
+    """
+    run(messages) has the workers send each one through `send(message)`
+    under the limiter and hand the ones that went out to `sink(messages)`
+    in batches; messages that failed for good go to `on_failed(message, error)`.
+    Once the daily limit is reached, or a session error stops sending, the
+    remaining messages are skipped; a message whose send was cut short by
+    the stop goes to `on_unsent(message)`.
+    """
+
+    def __init__(self, send, limiter, sink, workers, console=None, on_failed=None, on_unsent=None,
+                 max_retries=MAX_SEND_RETRIES, queue_size=SEND_QUEUE_SIZE, flush_every=SEND_FLUSH_EVERY):
+        self.send = send
+        self.limiter = limiter
+        self.on_failed = on_failed
+        self.on_unsent = on_unsent
+        self.max_retries = max_retries
+        self.console = console or Console()
+        self.stats = SendStats()
+        self._stop = threading.Event()   # set once the daily limit is reached or a session error stops sending
+        self._done = threading.Event()
+        self._stage = WorkerStage(self._deliver, sink, workers=workers, queue_size=queue_size,
+                                  flush_every=flush_every, keep_results=False, console=self.console,
+                                  name="Sending", describe=lambda message: message.get('recipient_email'))
+
+    def _backoff(self, attempt):
+        delay = min(RETRY_BACKOFF_MAX_SECONDS, RETRY_BACKOFF_SECONDS * 2 ** attempt)
+        time.sleep(delay * random.uniform(0.5, 1.5))
+
+    def _halt(self, reason):
+        """ Stop sending; the first reason given is the one reported """
+        with self.stats._lock:
+            first = self.stats.stopped is None
+            if first:
+                self.stats.stopped = reason
+        self._stop.set()
+        if first and reason != DAILY_LIMIT_REASON:
+            self.console.print(f"[bold red]Sending stopped: {reason}[/bold red]")
+
+    def _unsent(self, message):
+        """ Skipped after the stop; it may have been handed to send() before, so on_unsent puts it back """
+        self.stats.add(skipped=1)
+        if self.on_unsent is not None:
+            self.on_unsent(message)
+
+    def _deliver(self, message):
+        self.stats.add(queued=-1)
+        for attempt in range(self.max_retries + 1):
+            if self._stop.is_set():
+                self._unsent(message)
+                return None
+            try:
+                self.limiter.acquire()
+            except DailyLimitReached:
+                self._halt(DAILY_LIMIT_REASON)
+                self._unsent(message)
+                return None
+            try:
+                self.send(message)
+            except Exception as e:
+                temporary = is_temporary(e)
+                self.limiter.feedback(temporary)
+                self.limiter.refund()
+                if self._stop.is_set() and is_session_error(e):
+                    # Another worker already stopped the pipeline for the same reason
+                    self._unsent(message)
+                    return None
+                if temporary and attempt < self.max_retries:
+                    self.stats.add(retried=1)
+                    self._backoff(attempt)
+                    continue
+                if is_session_error(e):
+                    self._halt(f"{type(e).__name__}: {e}")
+                    self._unsent(message)
+                    return None
+                self.stats.add(failed=1)
+                self.console.print(f"[red]Error sending email to {message.get('recipient_email')}: {e}[/red]")
+                if self.on_failed is not None:
+                    self.on_failed(message, e)
+                return None
+            self.limiter.feedback(False)
+            self.stats.add(sent=1)
+            return message
+        return None
+
+    def run(self, messages):
+        """ Send every message with a live readout; returns the stats """
+        with Live(self.stats.render(self.limiter), console=self.console,
+                  refresh_per_second=1 / SEND_REFRESH_SECONDS, transient=False) as live:
+            refresher = threading.Thread(target=self._refresh, args=(live,), daemon=True)
+            refresher.start()
+            try:
+                for message in messages:
+                    if self._stop.is_set():
+                        self.stats.add(skipped=1)
+                        continue
+                    self.stats.add(queued=1)
+                    self._stage.put(message)
+            finally:
+                self._stage.close()
+                self._done.set()
+                refresher.join()
+                live.update(self.stats.render(self.limiter))
+        return self.stats
+
+    def _refresh(self, live):
+        while not self._done.wait(SEND_REFRESH_SECONDS):
+            live.update(self.stats.render(self.limiter))
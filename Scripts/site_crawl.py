@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from urllib.parse import urldefrag, urljoin
+import http_client
+import parse_pool
+from crawl_engine import host_key
+from extractor import merge_icp_rows
+
+# Bounded-depth crawl of one site for Option 1/4. After the homepage, the
+# contact / about / careers pages it links to are fetched concurrently and
+# their extraction results merged into the homepage row. Every site has a
+# time budget, from the homepage fetch on; it bounds the scheduler wait, the
+# request and the body read of every page, so a page still outstanding when
+# it runs out is dropped and its thread is free again.
+SITE_CRAWL_DEPTH = 1          # 0 = homepage only, 1 = + linked pages, 2 = + pages linked from those
+SITE_BUDGET_SECONDS = 20
+SITE_PAGE_WORKERS = 32        # shared by every site being crawled
+SITE_PAGE_KINDS = {           # kind: href markers
+    "contact": ("contact",),
+    "about": ("about", "team"),
+    "careers": ("career", "jobs"),
+}
+SKIP_SCHEMES = ("mailto:", "tel:", "javascript:", "#")
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _page_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ThreadPoolExecutor(max_workers=SITE_PAGE_WORKERS, thread_name_prefix="site-page")
+        return _pool
+
+
+class SiteCrawlStats:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.sites = 0
+        self.pages = 0
+        self.failed = 0
+        self.dropped = 0
+        self.over_budget = 0
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"Site crawl: {self.pages} extra pages from {self.sites} sites, {self.failed} failed, "
+                f"{self.dropped} dropped at the time budget ({self.over_budget} sites over budget)")
+
+
+stats = SiteCrawlStats()
+
+
+def site_deadline():
+    """ Deadline (time.monotonic()) for a site whose crawl starts now """
+    return time.monotonic() + SITE_BUDGET_SECONDS
+
+
+def _page_key(url):
+    return urldefrag(url)[0].rstrip("/").lower()
+
+
+def find_site_pages(base_url, hrefs):
+    """ First same-site link for each page kind """
+    site = host_key(base_url)
+    pages = {}
+    for href in hrefs:
+        if len(pages) == len(SITE_PAGE_KINDS):
+            break
+        lowered = href.strip().lower()
+        if not lowered or lowered.startswith(SKIP_SCHEMES):
+            continue
+        for kind, markers in SITE_PAGE_KINDS.items():
+            if kind not in pages and any(marker in lowered for marker in markers):
+                url = urljoin(base_url, href.strip())
+                if host_key(url) == site:
+                    pages[kind] = url
+                break
+    return list(pages.values())
+
+
+def _fetch_page(domain, url, deadline):
+    if time.monotonic() >= deadline:
+        return None
+    try:
+        res = http_client.get_page(url, deadline=deadline)
+        if res.status_code != 200:
+            return None
+        return parse_pool.extract_site_page(domain, url, res)
+    except Exception:
+        return None
+
+
+def crawl_site(domain, url, res, depth=SITE_CRAWL_DEPTH, deadline=None):
+    """ ICP row for domain from its homepage response plus up to `depth` levels of linked pages """
+    deadline = deadline or site_deadline()
+    row, hrefs = parse_pool.extract_site_page(domain, url, res)
+    visited = {_page_key(url)}
+    frontier = find_site_pages(url, hrefs)
+    pages = failed = dropped = 0
+    for _ in range(depth):
+        frontier = [page for page in frontier if _page_key(page) not in visited]
+        if not frontier or time.monotonic() >= deadline:
+            break
+        visited.update(_page_key(page) for page in frontier)
+        futures = {_page_pool().submit(_fetch_page, domain, page, deadline): page for page in frontier}
+        done, late = wait(futures, timeout=max(0.0, deadline - time.monotonic()))
+        for future in late:
+            future.cancel()
+        dropped += len(late)
+        next_frontier = []
+        for future in done:
+            result = future.result()
+            if result is None:
+                failed += 1
+                continue
+            page_row, page_hrefs = result
+            merge_icp_rows(row, page_row)
+            next_frontier.extend(find_site_pages(futures[future], page_hrefs))
+            pages += 1
+        frontier = next_frontier
+    stats.add(sites=1, pages=pages, failed=failed, dropped=dropped, over_budget=1 if dropped else 0)
+    return row
@@ -0,0 +1,155 @@
+import queue
+import smtplib
+import threading
+
+# Pooled SMTP sender for the email campaign. Up to SMTP_POOL_SIZE
+# authenticated connections are reused for many messages. The first is
+# opened when the pool is entered, so bad credentials fail once before any
+# message is taken, and once the server has refused the login the pool never
+# tries it again; the others are opened lazily. A connection that dropped is
+# replaced and the message retried once, and each connection is retired after
+# MESSAGES_PER_CONNECTION messages (Gmail and most relays cut a session off
+# after a few hundred).
+SMTP_HOST = "smtp.gmail.com"
+SMTP_PORT = 587
+SMTP_POOL_SIZE = 4
+MESSAGES_PER_CONNECTION = 100
+SMTP_TIMEOUT = 30
+
+# Errors that mean the connection is gone, not that the message was refused
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, ConnectionError, TimeoutError)
+
+
+class PoolStats:
+    FIELDS = ("connections", "reconnects", "retired", "messages")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            for name in self.FIELDS:
+                setattr(self, name, 0)
+
+    def add(self, **counts):
+        with self._lock:
+            for name, value in counts.items():
+                setattr(self, name, getattr(self, name) + value)
+
+    def summary(self):
+        return (f"SMTP pool: {self.messages} messages over {self.connections} connections "
+                f"({self.reconnects} reconnects after drops, {self.retired} retired at the per-connection limit)")
+
+
+class _Connection:
+    def __init__(self, server):
+        self.server = server
+        self.sent = 0
+
+
+class SMTPPool:
+    def __init__(self, username, password, host=SMTP_HOST, port=SMTP_PORT, size=SMTP_POOL_SIZE,
+                 messages_per_connection=MESSAGES_PER_CONNECTION, timeout=SMTP_TIMEOUT, starttls=True):
+        self.username = username
+        self.password = password
+        self.host = host
+        self.port = port
+        self.size = max(1, size)
+        self.messages_per_connection = messages_per_connection
+        self.timeout = timeout
+        self.starttls = starttls
+        self.stats = PoolStats()
+        self._idle = queue.LifoQueue()   # most recently used first, so idle extras can time out server-side
+        self._slots = threading.BoundedSemaphore(self.size)
+        self._auth_error = None
+
+    def _connect(self):
+        if self._auth_error is not None:
+            # Logging in again with refused credentials is what gets an account locked
+            raise self._auth_error
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls()
+            if self.password:
+                server.login(self.username, self.password)
+        except smtplib.SMTPAuthenticationError as e:
+            self._auth_error = e
+            server.close()
+            raise
+        except Exception:
+            server.close()
+            raise
+        self.stats.add(connections=1)
+        return _Connection(server)
+
+    @staticmethod
+    def _discard(conn, polite=True):
+        try:
+            conn.server.quit() if polite else conn.server.close()
+        except Exception:
+            conn.server.close()
+
+    def _acquire(self):
+        self._slots.acquire()
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        try:
+            return self._connect()
+        except Exception:
+            self._slots.release()
+            raise
+
+    def _release(self, conn):
+        if conn is None:
+            pass
+        elif conn.sent >= self.messages_per_connection:
+            self.stats.add(retired=1)
+            self._discard(conn)
+        else:
+            self._idle.put(conn)
+        self._slots.release()
+
+    def send(self, msg, from_addr=None, to_addrs=None):
+        """
+        Send an email.message.Message over a pooled connection. A dropped
+        connection is reopened and the message retried once; errors about the
+        message itself (refused recipient, rejected data) are raised as-is.
+        """
+        conn = self._acquire()
+        try:
+            try:
+                conn.server.send_message(msg, from_addr, to_addrs)
+            except CONNECTION_ERRORS:
+                self._discard(conn, polite=False)
+                conn = None
+                conn = self._connect()
+                self.stats.add(reconnects=1)
+                conn.server.send_message(msg, from_addr, to_addrs)
+            conn.sent += 1
+            self.stats.add(messages=1)
+        except CONNECTION_ERRORS:
+            if conn is not None:
+                self._discard(conn, polite=False)
+                conn = None
+            raise
+        finally:
+            self._release(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    def __enter__(self):
+        """ Open and log in to the first connection; bad credentials raise here """
+        self._idle.put(self._connect())
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
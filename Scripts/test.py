@@ -1,13 +1,16 @@
-import pandas as pd
 import os
 from datetime import datetime
 from rich.console import Console
 from rich.panel import Panel
 from rich.prompt import Prompt
 from rich.text import Text
+from lead_store import LeadStore
+from email_templates import compile_template, iter_chunks, present, recipient_names
 
 console = Console()
 
+EMAIL_CHUNK_ROWS = 10_000
+
 # -------------------- Step 1: Define Email Templates --------------------
 
 # Formal Email
@@ -56,60 +59,37 @@ def get_template_choice():
         console.print("[bold red]Invalid choice, defaulting to Formal Template.[/bold red]")
         return formal_template
 
-# -------------------- Step 4: Read Data from All Excel Files --------------------
-def read_all_excel_files():
-    """ Read all Excel files in the output folder """
-    output_folder = os.path.join(os.getcwd(), "output")
-    all_files = [f for f in os.listdir(output_folder) if f.endswith('.xlsx')]
-    
-    data_frames = []
-    for file in all_files:
-        file_path = os.path.join(output_folder, file)
-        df = pd.read_excel(file_path)
-        data_frames.append(df)
-    
-    
-    combined_data = pd.concat(data_frames, ignore_index=True)
-    return combined_data
+# -------------------- Step 4: Read Leads from the Lead Store --------------------
+
+def read_leads(store):
+    """ Leads with an email that have not been contacted yet, from the lead store """
+    if store.count() == 0:
+        imported = store.import_workbooks(os.path.join(os.getcwd(), "output"))
+        console.print(f"[cyan]Imported {imported} leads from existing Excel files into the lead store[/cyan]")
+    return store.iter_leads_to_contact(EMAIL_CHUNK_ROWS)
 
 # -------------------- Step 5: Generate Emails --------------------
-def generate_email_template(data, template, your_name, your_position, your_company, your_email):
-    """ Generate personalized emails based on data """
-    emails = []
-    valid_email_count = 0
-    invalid_email_count = 0
-
-    for index, row in data.iterrows():
-        recipient_name = row['Contact Person'] if row['Contact Person'] else "Dear Sir/Mam"
-        company_name = row['Company Name']
-        contact_email = row['Contact Email']
-
-        
-        if not contact_email or pd.isnull(contact_email):
-            invalid_email_count += 1
-            continue
-
-        valid_email_count += 1
-        
-        subject = f"Exciting Opportunities for {company_name} with {your_company}"
-
-        
-        email_body = template.format(
-            recipient_name=recipient_name,
-            company_name=company_name,
-            your_email=your_email,  
-            your_name=your_name,
-            your_position=your_position,
-            your_company=your_company
-        )
-        emails.append({
-            'email_body': email_body,
-            'company_name': company_name,
-            'recipient_email': contact_email,
-            'subject': subject
-        })
-
-    return emails, valid_email_count, invalid_email_count
+def generate_email_template(data, template, your_name, your_position, your_company, your_email, counts=None):
+    """ Yield personalized emails based on data, a chunk of leads at a time; valid/invalid tallies go into counts """
+    counts = {'valid': 0, 'invalid': 0} if counts is None else counts
+    compiled = compile_template(template).bind(your_email=your_email, your_name=your_name,
+                                               your_position=your_position, your_company=your_company)
+    for chunk in iter_chunks(data, EMAIL_CHUNK_ROWS):
+        valid = present(chunk['Contact Email'])
+        valid_count = int(valid.sum())
+        counts['valid'] += valid_count
+        counts['invalid'] += len(chunk) - valid_count
+        chunk = chunk[valid]
+
+        bodies = compiled.render(recipient_name=recipient_names(chunk), company_name=chunk['Company Name'])
+        for body, company_name, contact_email in zip(bodies, chunk['Company Name'].tolist(),
+                                                     chunk['Contact Email'].tolist()):
+            yield {
+                'email_body': body,
+                'company_name': company_name,
+                'recipient_email': contact_email,
+                'subject': f"Exciting Opportunities for {company_name} with {your_company}"
+            }
 
 # -------------------- Step 6: Simulate Email Sending --------------------
 def simulate_send_email(emails):
@@ -129,21 +109,24 @@ def main():
     your_name, your_position, your_company, your_email = get_sender_details()
 
     
-    data = read_all_excel_files()
+    lead_store = LeadStore(os.path.join(os.getcwd(), "output", "leads.sqlite"))
+    data = read_leads(lead_store)
 
     
     template_choice = get_template_choice()
 
     
-    emails, valid_email_count, invalid_email_count = generate_email_template(
-        data, template_choice, your_name, your_position, your_company, your_email
+    counts = {'valid': 0, 'invalid': 0}
+    emails = generate_email_template(
+        data, template_choice, your_name, your_position, your_company, your_email, counts
     )
 
     
     simulate_send_email(emails)
 
-    console.print(f"\n[bold green]Total valid emails: {valid_email_count}[/bold green]")
-    console.print(f"[bold red]Total invalid emails (missing or invalid): {invalid_email_count}[/bold red]")
+    console.print(f"\n[bold green]Total valid emails: {counts['valid']}[/bold green]")
+    invalid = counts['invalid'] + lead_store.count_without_email()
+    console.print(f"[bold red]Total invalid emails (missing or invalid): {invalid}[/bold red]")
 
 if __name__ == "__main__":
     main()
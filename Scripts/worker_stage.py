@@ -0,0 +1,109 @@
+import queue
+import threading
+from rich.console import Console
+
+# Bounded worker stage. A producer put()s items into a bounded queue and a
+# pool of worker threads runs `work(item)` on each; results are handed to
+# `sink(results)` in batches. A full queue blocks the producer instead of
+# growing memory (backpressure). The Option 2 enrichment stage
+# (enrichment.py), ScrapingDog batches and the email send pipeline run on it.
+STAGE_WORKERS = 16
+STAGE_QUEUE_SIZE = 64
+STAGE_FLUSH_EVERY = 25
+
+_STOP = object()
+
+
+def describe_item(item):
+    return str(item)[:120]
+
+
+class WorkerStage:
+    """
+    put() items, workers run `work(item)` and the results are handed to
+    `sink(results)` in batches of flush_every. work may return one result,
+    a list of results or None. With keep_results=False only the sink sees
+    them (close() returns []). An item whose work raises is logged, as
+    "{name} failed for {describe(item)}", and counted in `failed`; a batch
+    the sink could not write is counted in `unsaved`. Neither stops the workers.
+    """
+
+    def __init__(self, work, sink, workers=STAGE_WORKERS, queue_size=STAGE_QUEUE_SIZE,
+                 flush_every=STAGE_FLUSH_EVERY, keep_results=True, console=None, name="Work",
+                 describe=describe_item):
+        self.work = work
+        self.sink = sink
+        self.flush_every = flush_every
+        self.keep_results = keep_results
+        self.console = console or Console()
+        self.name = name
+        self.describe = describe
+        self.count = 0
+        self.failed = 0
+        self.unsaved = 0
+        self.results = []
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._pending = []
+        self._lock = threading.Lock()
+        self._sink_lock = threading.Lock()   # batches are written one at a time, outside _lock
+        self._threads = [threading.Thread(target=self._work, daemon=True) for _ in range(workers)]
+        for thread in self._threads:
+            thread.start()
+
+    def _work(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is _STOP:
+                    return
+                self._process(item)
+            finally:
+                self._queue.task_done()
+
+    def _process(self, item):
+        try:
+            results = self.work(item)
+        except Exception as e:
+            with self._lock:
+                self.failed += 1
+            self.console.print(f"[red] {self.name} failed for {self.describe(item)}: {e}[/red]")
+            return
+        if results is None:
+            return
+        if not isinstance(results, list):
+            results = [results]
+        batch = None
+        with self._lock:
+            self.count += len(results)
+            if self.keep_results:
+                self.results.extend(results)
+            self._pending.extend(results)
+            if len(self._pending) >= self.flush_every:
+                batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+
+    def _write(self, batch):
+        try:
+            with self._sink_lock:
+                self.sink(batch)
+        except Exception as e:
+            with self._lock:
+                self.unsaved += len(batch)
+            self.console.print(f"[red] {self.name}: could not write {len(batch)} results: {e}[/red]")
+
+    def put(self, item):
+        """ Blocks while the queue is full """
+        self._queue.put(item)
+
+    def close(self):
+        """ Wait for the workers to drain the queue and write what is left """
+        for _ in self._threads:
+            self._queue.put(_STOP)
+        for thread in self._threads:
+            thread.join()
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if batch:
+            self._write(batch)
+        return self.results
@@ -0,0 +1,103 @@
+"""
+Regression benchmark for the email / phone extraction in contact_patterns.
+Runs the ICP path (find_emails + find_phones) and the Option 2 contact path
+(first_email + first_phone) over adversarial and large inputs, the large
+ones at the 2 MB page cap http_client enforces, and fails (exit 1) if any
+page goes over the per-page time budget. The old inline EMAIL_PATTERN is timed on the small variants for
+comparison; on the large ones it would run for minutes.
+
+    python benchmarks/bench_contact_patterns.py [budget_ms]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from contact_patterns import (EMAIL_PATTERN, find_emails, find_phones, first_email,  # noqa: E402
+                              first_phone, iter_emails)
+from http_client import PAGE_MAX_BYTES  # noqa: E402
+from pages import synthetic_page  # noqa: E402
+
+PAGE_BUDGET_MS = 250
+LEGACY_MAX_CHARS = 20_000
+
+
+def adversarial_pages(size):
+    """ Inputs that make a backtracking regex retry from every character """
+    return {
+        "long token": "a" * size,
+        "dotted token": "a." * (size // 2),
+        "digit run": "1" * size,
+        "digits + separators": ("1-" * (size // 2)) + "x",
+        "digit clusters + spaces": ("1234567" + " " * 2000 + "x ") * (size // 2009),
+        "whitespace": "1" + " " * size,
+        "many @": "a@" * (size // 2),
+        "@ + long domain": "x@" + "a-" * (size // 2),
+        "obfuscated @": "name [at] " * (size // 10),
+        "base64 blob": ("QUJDREVGR0hJSktMTU5PUFFSU1RVVldYWVo" * (size // 35 + 1))[:size],
+    }
+
+
+def timed(fn, text):
+    started = time.perf_counter()
+    fn(text)
+    return (time.perf_counter() - started) * 1000
+
+
+def icp_path(text):
+    find_emails(text)
+    find_phones(text)
+
+
+def contact_path(text):
+    first_email(text)
+    first_phone(text)
+
+
+def check_parity():
+    """ iter_emails must find what EMAIL_PATTERN found on ordinary pages """
+    samples = [synthetic_page(256 * 1024, seed=seed) for seed in range(4)] + [
+        "mail a@b.com, x.y+z@sub.example.co.uk; bad@nodot and a@b.com@c.org end",
+        "contact: sales@acme-corp.com. or support@acme-corp.com.",
+    ]
+    for text in samples:
+        assert list(iter_emails(text)) == EMAIL_PATTERN.findall(text), text[:80]
+    assert find_emails("write to jane.doe [at] acme [dot] com or bob(at)acme(dot)io") == \
+        ["jane.doe@acme.com", "bob@acme.io"]
+    assert find_phones("call +1 (415) 555-0100 or 020 7946 0958\n\n\n", ["+91 98000 00000"]) == \
+        ["+14155550100", "02079460958", "+919800000000"]
+    assert first_phone("tel +44 20 7946 0958 now") == "+44 20 7946 0958"
+    print("parity: iter_emails == EMAIL_PATTERN.findall on sample pages, obfuscated addresses and phones found")
+
+
+def main():
+    budget = float(sys.argv[1]) if len(sys.argv) > 1 else PAGE_BUDGET_MS
+    check_parity()
+    over = []
+
+    print(f"\nlegacy EMAIL_PATTERN vs ICP path on {LEGACY_MAX_CHARS // 1000}K-char inputs")
+    for name, text in adversarial_pages(LEGACY_MAX_CHARS).items():
+        legacy = timed(EMAIL_PATTERN.findall, text)
+        new = timed(icp_path, text)
+        print(f"  {name:<24} legacy {legacy:8.1f} ms   new {new:6.2f} ms")
+
+    size_mb = PAGE_MAX_BYTES // (1024 * 1024)
+    print(f"\n{size_mb} MB inputs (budget {budget:.0f} ms/page)       ICP path   contact path")
+    cases = adversarial_pages(PAGE_MAX_BYTES)
+    cases["synthetic homepage"] = synthetic_page(PAGE_MAX_BYTES, seed=1)
+    for name, text in cases.items():
+        icp, contact = timed(icp_path, text), timed(contact_path, text)
+        flag = "" if max(icp, contact) <= budget else "  OVER BUDGET"
+        if flag:
+            over.append(name)
+        print(f"  {name:<34} {icp:8.1f} ms  {contact:8.1f} ms{flag}")
+
+    if over:
+        print(f"\n{len(over)} page(s) over the {budget:.0f} ms budget: {', '.join(over)}")
+        sys.exit(1)
+    print("\nall pages within budget")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,127 @@
+"""
+Microbenchmark: single-pass extract_icp_row() vs the previous multi-pass
+extraction in extract_icp_from_website(), on 1-5 MB synthetic homepages.
+
+    python benchmarks/bench_icp_extract.py
+"""
+import os
+import re
+import sys
+import time
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from extractor import INDUSTRY_KEYWORDS, NAME_PATTERN, extract_icp_fields, extract_icp_row  # noqa: E402
+from pages import synthetic_page  # noqa: E402
+
+SIZES_MB = [1, 2, 5]
+REPEATS = 3
+# Fields that were built from set() before, so their order was never stable
+UNORDERED_FIELDS = {"Emails", "Phones", "Gov / Partner Links"}
+
+
+def legacy_extract(domain, url, html):
+    """ Body of extract_icp_from_website() before the single-pass extractor """
+    return legacy_fields(domain, url, html, BeautifulSoup(html, 'html.parser'))
+
+
+def legacy_fields(domain, url, html, soup):
+    text = soup.get_text(separator=" ")
+    title = soup.title.string.strip() if soup.title else "N/A"
+    meta_desc = soup.find("meta", attrs={"name": "description"}) or soup.find("meta", attrs={"property": "og:description"})
+    description = meta_desc["content"].strip() if meta_desc and meta_desc.get("content") else ""
+    h1 = soup.find('h1')
+    company_name = h1.get_text(strip=True) if h1 else title
+    found_names = NAME_PATTERN.findall(text)
+    contact_person = found_names[0] if found_names else "N/A"
+    industry = "N/A"
+    for keyword in INDUSTRY_KEYWORDS:
+        if keyword.lower() in description.lower() or keyword.lower() in text.lower():
+            industry = keyword.capitalize()
+            break
+    emails = list(set(re.findall(r"[a-zA-Z0-9_.+-]+@[a-zA-Z0-9-]+\.[a-zA-Z0-9-.]+", text)))
+    phones_from_text = re.findall(r"\+?\d[\d\s\-().]{7,}", text)
+    phones_from_tel = [a['href'].replace("tel:", "") for a in soup.find_all('a', href=True) if a['href'].startswith("tel:")]
+    all_phones = set()
+    for phone in phones_from_text + phones_from_tel:
+        clean = re.sub(r"[^\d+]", "", phone)
+        if 7 <= len(clean) <= 15:
+            all_phones.add(clean)
+    phones = list(all_phones) if all_phones else []
+    whatsapp_links = [a['href'] for a in soup.find_all('a', href=True) if "wa.me" in a['href'] or "whatsapp.com" in a['href']]
+    all_links = [a['href'] for a in soup.find_all('a', href=True)]
+    socials = {"LinkedIn": "", "Twitter": "", "Facebook": "", "Instagram": "", "YouTube": ""}
+    for href in all_links:
+        if "linkedin.com" in href:
+            socials["LinkedIn"] = href
+        elif "twitter.com" in href:
+            socials["Twitter"] = href
+        elif "facebook.com" in href:
+            socials["Facebook"] = href
+        elif "instagram.com" in href:
+            socials["Instagram"] = href
+        elif "youtube.com" in href:
+            socials["YouTube"] = href
+    contact_page = next((urljoin(url, link) for link in all_links if "contact" in link.lower()), "N/A")
+    careers_page = next((urljoin(url, link) for link in all_links if "career" in link.lower() or "jobs" in link.lower()), "N/A")
+    partner_links = [link for link in all_links if any(p in link for p in ['.gov', '.org', '.edu', 'partner', 'ngo', 'ministry'])]
+    partner_links = list(set(partner_links)) if partner_links else []
+    address = "N/A"
+    for line in text.split("\n"):
+        if any(word in line.lower() for word in ['address', 'location', 'hq', 'head office']) and len(line) < 150:
+            address = line.strip()
+            break
+    lowered_html = html.lower()
+    tech = []
+    for t in ["wordpress", "shopify", "react", "vue", "django", "laravel", "jquery", "bootstrap"]:
+        if t in lowered_html:
+            tech.append(t.capitalize())
+    tech_stack = ", ".join(tech) if tech else "Unknown"
+    return {
+        "Website": domain, "Company Name": company_name, "Contact Person": contact_person,
+        "Industry": industry, "Location": address,
+        "Emails": "; ".join(emails) if emails else "N/A",
+        "Phones": "; ".join(phones) if phones else "N/A",
+        "WhatsApp": "; ".join(whatsapp_links) if whatsapp_links else "N/A",
+        "Contact Page": contact_page, "Careers Page": careers_page, "Tech Stack": tech_stack,
+        "LinkedIn": socials["LinkedIn"] or "N/A", "Twitter": socials["Twitter"] or "N/A",
+        "Facebook": socials["Facebook"] or "N/A", "Instagram": socials["Instagram"] or "N/A",
+        "YouTube": socials["YouTube"] or "N/A",
+        "Gov / Partner Links": "; ".join(partner_links) if partner_links else "N/A",
+    }
+
+
+def normalise(row):
+    return {k: sorted(v.split("; ")) if k in UNORDERED_FIELDS else v for k, v in row.items()}
+
+
+def best_of(fn, *args):
+    best = float("inf")
+    for _ in range(REPEATS):
+        started = time.perf_counter()
+        result = fn(*args)
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    domain, url = "acme.example", "https://acme.example"
+    print("Extraction stage (page already parsed) and end-to-end (parse + extraction), best of", REPEATS)
+    print(f"{'size':>6} {'stage legacy':>13} {'stage new':>10} {'speedup':>8} "
+          f"{'e2e legacy':>11} {'e2e new':>8} {'speedup':>8}  rows match")
+    for size_mb in SIZES_MB:
+        html = synthetic_page(size_mb * 1024 * 1024, seed=size_mb)
+        soup = BeautifulSoup(html, 'html.parser')
+        stage_legacy, legacy_row = best_of(legacy_fields, domain, url, html, soup)
+        stage_new, new_row = best_of(extract_icp_fields, domain, url, html, soup)
+        e2e_legacy, _ = best_of(legacy_extract, domain, url, html)
+        e2e_new, _ = best_of(extract_icp_row, domain, url, html)
+        match = normalise(legacy_row) == normalise(new_row)
+        print(f"{size_mb:>4}MB {stage_legacy:>13.3f} {stage_new:>10.3f} {stage_legacy / stage_new:>7.2f}x "
+              f"{e2e_legacy:>11.3f} {e2e_new:>8.3f} {e2e_legacy / e2e_new:>7.2f}x  {match}")
+
+
+if __name__ == "__main__":
+    main()
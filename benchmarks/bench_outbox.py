@@ -0,0 +1,69 @@
+"""
+Outbox throughput on a large campaign: enqueue N generated emails, page
+through the queue, and run the per-message state transitions the send
+pipeline makes (sending one at a time, sent in batches), reporting rows/sec
+for each step and the size of the database.
+
+    python benchmarks/bench_outbox.py [messages] [body_bytes]
+"""
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from outbox import Outbox, campaign_id  # noqa: E402
+from send_pipeline import SEND_FLUSH_EVERY  # noqa: E402
+
+MESSAGES = 1_000_000
+BODY_BYTES = 1500
+
+
+def emails(count, body_bytes):
+    body = "x" * body_bytes
+    for i in range(count):
+        yield {'recipient_email': f"lead{i}@company{i % 5000}.com", 'company_name': f"Company {i}",
+               'email_body': body}
+
+
+def timed(label, count, fn):
+    started = time.perf_counter()
+    result = fn()
+    elapsed = time.perf_counter() - started
+    print(f"  {label:<34} {elapsed:7.2f} s  {count / elapsed:10,.0f} rows/sec")
+    return result
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else MESSAGES
+    body_bytes = int(sys.argv[2]) if len(sys.argv) > 2 else BODY_BYTES
+    with tempfile.TemporaryDirectory() as folder:
+        outbox = Outbox(os.path.join(folder, "outbox.sqlite"))
+        campaign = campaign_id("bench")
+        print(f"{count:,} messages of {body_bytes} bytes")
+        added = timed("enqueue", count, lambda: outbox.enqueue(campaign, emails(count, body_bytes)))
+        assert added == count
+        timed("re-enqueue (all duplicates)", count, lambda: outbox.enqueue(campaign, emails(count, body_bytes)))
+        pending = timed("page through queued", count, lambda: list(outbox.pending(campaign)))
+
+        def transitions():
+            batch = []
+            for message in pending:
+                outbox.mark_sending(message)
+                batch.append(message)
+                if len(batch) >= SEND_FLUSH_EVERY:
+                    outbox.mark_sent(batch)
+                    batch = []
+            outbox.mark_sent(batch)
+
+        timed("sending + sent transitions", count, transitions)
+        assert outbox.counts(campaign)["sent"] == count
+        print(f"  {outbox.summary(campaign)}")
+        outbox.close()
+        size = sum(os.path.getsize(os.path.join(folder, name)) for name in os.listdir(folder))
+        print(f"  database {size / 1024 ** 2:,.0f} MB")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Parse-stage scaling: pages/sec of the ICP extraction with a thread pool
+(the old setup, GIL-bound) and with the pool parse_pool.enable() ships
+(forkserver / spawn workers, all started before the timer) at 1, 2, 4 ...
+up to os.cpu_count() workers; with 1 worker parse_pool runs inline, so
+that is what is timed. Pages are submitted as raw bytes, the way the fetch
+threads hand them over.
+
+    python benchmarks/bench_parse_scaling.py [pages] [page_kb]
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import parse_pool  # noqa: E402
+from pages import synthetic_page  # noqa: E402
+
+PAGES = 64
+PAGE_KB = 256
+
+
+def worker_counts(cores):
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def run_inline(pages):
+    started = time.perf_counter()
+    for i, page in enumerate(pages):
+        parse_pool._icp_row(f"site{i}.com", f"https://site{i}.com", page, "utf-8")
+    return len(pages) / (time.perf_counter() - started)
+
+
+def run(executor, pages):
+    started = time.perf_counter()
+    futures = [executor.submit(parse_pool._icp_row, f"site{i}.com", f"https://site{i}.com", page, "utf-8")
+               for i, page in enumerate(pages)]
+    for future in futures:
+        future.result()
+    return len(pages) / (time.perf_counter() - started)
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else PAGES
+    page_kb = int(sys.argv[2]) if len(sys.argv) > 2 else PAGE_KB
+    cores = os.cpu_count() or 1
+    pages = [synthetic_page(page_kb * 1024, seed=i).encode("utf-8") for i in range(count)]
+    print(f"{count} pages of {page_kb} KB, {cores} cores")
+
+    with ThreadPoolExecutor(max_workers=cores) as executor:
+        threaded = run(executor, pages)
+    print(f"  threads   x{cores:<3} {threaded:7.1f} pages/sec  (GIL-bound baseline)")
+
+    baseline = None
+    for workers in worker_counts(cores):
+        pool = parse_pool.enable(workers)   # returns once every worker has started
+        try:
+            rate = run(pool, pages) if pool is not None else run_inline(pages)
+        finally:
+            parse_pool.close()
+        baseline = baseline or rate
+        speedup = rate / baseline
+        print(f"  {'inline' if pool is None else 'processes':<9} x{workers:<3} {rate:7.1f} pages/sec  speedup {speedup:4.2f}x  "
+              f"efficiency {speedup / workers:4.0%}")
+
+
+if __name__ == "__main__":
+    main()
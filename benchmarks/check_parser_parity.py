@@ -0,0 +1,98 @@
+"""
+Checks that every installed parser backend gives field-for-field identical
+lead rows on the fixture corpus in benchmarks/fixtures/, then times each
+backend on a large page.
+
+It also reports what a "head + first N KB" parse would lose on each
+fixture. The scraper has no such mode: links, emails and phones after the
+cut (footer socials, a /contact link) are dropped, and every extraction
+needs them. The losses are listed, not counted as failures.
+
+    python benchmarks/check_parser_parity.py
+"""
+import os
+import re
+import sys
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, "..", "Scripts"))
+
+from extractor import classify_links, extract_contact_details, extract_icp_fields, walk_document, _page_heading  # noqa: E402
+from html_parsing import PARSER_BACKENDS, backend_available, parse_html  # noqa: E402
+from pages import synthetic_page  # noqa: E402
+
+FIXTURES = os.path.join(HERE, "fixtures")
+REFERENCE = "html.parser"
+PARTIAL_KB = 1
+HEAD_END = re.compile(r"</head\s*>", re.IGNORECASE)
+
+
+def head_and_first_kb(html, kb):
+    """ The whole <head> plus the first kb KB after it, cut on a tag boundary """
+    head_end = HEAD_END.search(html)
+    start = head_end.end() if head_end else 0
+    limit = start + kb * 1024
+    if limit >= len(html):
+        return html
+    cut = html.rfind(">", start, limit)
+    return html[:cut + 1] if cut != -1 else html[:start]
+
+
+def page_meta(url, html, backend):
+    """ Title, description, first email / phone and link hits of a page """
+    soup = parse_html(html, backend=backend)
+    email, phone = extract_contact_details(soup)
+    doc = walk_document(soup)
+    title, description, company_name = _page_heading(doc)
+    return {"Title": title, "Description": description, "Company Name": company_name,
+            "Email": email, "Phone": phone, **classify_links(url, doc["hrefs"])}
+
+
+def lead_rows(name, html, backend):
+    url = f"https://{name}"
+    soup = parse_html(html, backend=backend)
+    return extract_icp_fields(name, url, html, soup), extract_contact_details(parse_html(html, backend=backend))
+
+
+def diff(expected, actual):
+    return {k: (expected[k], actual.get(k)) for k in expected if expected[k] != actual.get(k)}
+
+
+def main():
+    backends = [b for b in PARSER_BACKENDS if backend_available(b)]
+    print(f"Installed backends: {', '.join(backends)}")
+    failures = 0
+    for filename in sorted(os.listdir(FIXTURES)):
+        with open(os.path.join(FIXTURES, filename), encoding="utf-8") as f:
+            html = f.read()
+        name = os.path.splitext(filename)[0] + ".example"
+        url = f"https://{name}"
+        reference_row, reference_contact = lead_rows(name, html, REFERENCE)
+        for backend in backends:
+            if backend == REFERENCE:
+                continue
+            row, contact = lead_rows(name, html, backend)
+            mismatch = diff(reference_row, row)
+            if contact != reference_contact:
+                mismatch["contact details"] = (reference_contact, contact)
+            failures += bool(mismatch)
+            print(f"  {filename:<24} {backend:<20} {'OK' if not mismatch else mismatch}")
+        partial = head_and_first_kb(html, PARTIAL_KB)
+        if partial != html:
+            lost = diff(page_meta(url, html, REFERENCE), page_meta(url, partial, REFERENCE))
+            print(f"  {filename:<24} {f'head + {PARTIAL_KB} KB':<20} "
+                  f"{'nothing lost' if not lost else 'expected losses: ' + ', '.join(lost)}")
+
+    html = synthetic_page(2 * 1024 * 1024)
+    for backend in backends:
+        started = time.perf_counter()
+        parse_html(html, backend=backend)
+        print(f"  2 MB page {backend:<12} full parse {time.perf_counter() - started:.3f}s")
+
+    print("All rows identical" if not failures else f"{failures} mismatching rows")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,63 @@
+import random
+
+# Synthetic homepages for the scraper benchmarks. They mimic what we see on
+# real company sites: a nav bar, repeated content blocks, footer links,
+# inline scripts and a few contact details scattered through the body.
+
+# Body copy avoids the early INDUSTRY_KEYWORDS so the industry lookup has to
+# reach "logistics" near the end of the list, as it does on many real sites.
+WORDS = (
+    "we move freight for enterprise teams our network helps customers ship "
+    "faster with secure warehousing and modern fleet practices trusted by "
+    "leading brands across the world since 2009 logistics"
+).split()
+FIRST_NAMES = ["Priya", "Rahul", "Anna", "James", "Mei", "Carlos", "Sara", "David"]
+LAST_NAMES = ["Shah", "Patel", "Smith", "Chen", "Garcia", "Miller", "Khan", "Brown"]
+NAV_LINKS = [
+    "/", "/about", "/contact-us", "/careers", "/jobs/engineering", "/blog",
+    "https://www.linkedin.com/company/acme", "https://twitter.com/acme",
+    "https://www.facebook.com/acme", "https://www.instagram.com/acme",
+    "https://www.youtube.com/c/acme", "https://wa.me/919800000000",
+    "tel:+91 98000 00000", "https://partner.example.org/acme", "https://data.gov.in",
+]
+
+
+def _paragraph(rng, words=60):
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _block(rng, i):
+    person = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+    parts = [f"<section id='s{i}'><h2>Section {i}</h2><p>{_paragraph(rng)}</p>"]
+    if i % 7 == 0:
+        parts.append(f"<p>Talk to {person} at sales{i}@acme-corp.com or call +1 (415) 555-{i % 10000:04d}</p>")
+    if i % 11 == 0:
+        parts.append(f"<p>Head office address: {i} Market Street, San Francisco</p>")
+    if i % 5 == 0:
+        parts.append("<ul>" + "".join(f"<li><a href='{rng.choice(NAV_LINKS)}'>link</a></li>" for _ in range(5)) + "</ul>")
+    if i % 13 == 0:
+        parts.append("<script>window.__data = {react: true, items: [1,2,3]};</script>")
+    parts.append("</section>")
+    return "".join(parts)
+
+
+def synthetic_page(size_bytes, seed=0):
+    """ Deterministic HTML document of roughly size_bytes """
+    rng = random.Random(seed)
+    head = (
+        "<!DOCTYPE html><html><head><title>Acme Corp | Freight Network</title>"
+        "<meta name='description' content='Acme runs freight and warehousing for shops'>"
+        "<link rel='stylesheet' href='/wp-content/themes/acme/bootstrap.min.css'>"
+        "<script src='/static/jquery.min.js'></script></head><body>"
+        "<nav>" + "".join(f"<a href='{href}'>Menu</a>" for href in NAV_LINKS) + "</nav>"
+        "<h1>Acme Corp</h1>"
+    )
+    blocks = []
+    size = len(head)
+    i = 0
+    while size < size_bytes:
+        block = _block(rng, i)
+        blocks.append(block)
+        size += len(block)
+        i += 1
+    return head + "".join(blocks) + "<footer>Made with WordPress</footer></body></html>"
@@ -24,5 +24,10 @@ setup(
         'rich',
         'scrapingdog',
         'serpapi',
+        'ijson',
     ],
+    extras_require={
+        'fast': ['lxml'],         # faster HTML parsing; html.parser is used without it
+        'parquet': ['pyarrow'],   # only for OUTPUT_FORMAT = "parquet"
+    },
 )
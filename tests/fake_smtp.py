@@ -0,0 +1,67 @@
+import socketserver
+import threading
+
+
+class FakeSMTPServer(socketserver.ThreadingTCPServer):
+    """
+    Just enough of an SMTP server for smtplib: AUTH PLAIN is accepted or
+    answered with 535, recipients starting with "bad" get a 550, and logins
+    and delivered messages are counted.
+    """
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, accept_login=True):
+        super().__init__(("127.0.0.1", 0), _Session)
+        self.accept_login = accept_login
+        self.logins = 0
+        self.messages = 0
+        self._lock = threading.Lock()
+
+    @property
+    def port(self):
+        return self.server_address[1]
+
+    def count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _Session(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode("ascii") + b"\r\n")
+
+    def handle(self):
+        self.reply("220 fake ESMTP")
+        for raw in self.rfile:
+            command = raw.decode("ascii", "replace").strip()
+            verb = command.split(" ", 1)[0].upper()
+            if verb == "EHLO":
+                self.reply("250-fake")
+                self.reply("250 AUTH PLAIN")
+            elif verb == "AUTH":
+                self.server.count("logins")
+                self.reply("235 2.7.0 Accepted" if self.server.accept_login
+                           else "535 5.7.8 Authentication credentials invalid")
+            elif verb == "RCPT":
+                self.reply("550 5.1.1 No such user" if "<bad" in command else "250 OK")
+            elif verb == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                for line in self.rfile:
+                    if line.rstrip(b"\r\n") == b".":
+                        break
+                self.server.count("messages")
+                self.reply("250 OK")
+            elif verb == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
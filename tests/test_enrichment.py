@@ -0,0 +1,47 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from enrichment import EnrichmentStage  # noqa: E402
+
+
+def run_stage(stage, items, timeout=10):
+    """ put() every item and close() in a thread; fails instead of hanging if the stage deadlocks """
+    result = {}
+
+    def produce():
+        for item in items:
+            stage.put(item)
+        result["leads"] = stage.close()
+
+    thread = threading.Thread(target=produce, daemon=True)
+    thread.start()
+    thread.join(timeout)
+    assert not thread.is_alive(), "EnrichmentStage hung"
+    return result["leads"]
+
+
+def test_raising_enrich_does_not_hang_close():
+    def enrich(item):
+        if item % 3 == 0:
+            raise ValueError(f"bad result {item}")
+        return {"item": item}
+
+    written = []
+    stage = EnrichmentStage(enrich, written.extend, workers=2, queue_size=4, flush_every=5)
+    leads = run_stage(stage, range(30))
+    assert stage.failed == 10
+    assert len(leads) == 20
+    assert sorted(lead["item"] for lead in written) == sorted(lead["item"] for lead in leads)
+
+
+def test_raising_sink_does_not_hang_close():
+    def sink(batch):
+        raise OSError("disk full")
+
+    stage = EnrichmentStage(lambda item: {"item": item}, sink, workers=2, queue_size=4, flush_every=3)
+    leads = run_stage(stage, range(20))
+    assert len(leads) == 20
+    assert stage.unsaved == 20
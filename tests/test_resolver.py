@@ -0,0 +1,51 @@
+import os
+import sys
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import resolver  # noqa: E402
+from resolver import Resolver  # noqa: E402
+
+
+def refused():
+    return requests.exceptions.ConnectionError(ConnectionRefusedError(111, "Connection refused"))
+
+
+def timed_out():
+    return requests.exceptions.ConnectTimeout("connect timed out")
+
+
+def fail_once_per_run(path, url, error, runs):
+    """ One failure per run, with the resolver reopened in between as a new run would """
+    for _ in range(runs):
+        run = Resolver(path=path)
+        run.record_failure(url, error())
+        run.close()
+    return Resolver(path=path)
+
+
+def test_strikes_add_up_across_runs(tmp_path):
+    path = str(tmp_path / "dead_hosts.sqlite")
+    after_one = fail_once_per_run(path, "https://refused.example/", refused, runs=1)
+    assert after_one.dead_count() == 0
+    after_one.close()
+    assert fail_once_per_run(path, "https://refused.example/", refused, runs=1).dead_count() == 1
+    assert fail_once_per_run(path, "https://slow.example/", timed_out, runs=3).dead_count() == 2
+
+
+def test_success_between_runs_resets_the_strikes(tmp_path):
+    path = str(tmp_path / "dead_hosts.sqlite")
+    fail_once_per_run(path, "https://flaky.example/", refused, runs=1).close()
+    run = Resolver(path=path)
+    run.record_success("https://flaky.example/about")
+    run.close()
+    assert fail_once_per_run(path, "https://flaky.example/", refused, runs=1).dead_count() == 0
+
+
+def test_old_strikes_expire(tmp_path, monkeypatch):
+    path = str(tmp_path / "dead_hosts.sqlite")
+    fail_once_per_run(path, "https://refused.example/", refused, runs=1).close()
+    monkeypatch.setattr(resolver, "STRIKE_WINDOW_SECONDS", -1)
+    assert fail_once_per_run(path, "https://refused.example/", refused, runs=1).dead_count() == 0
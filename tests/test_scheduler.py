@@ -0,0 +1,53 @@
+import os
+import sys
+import time
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from scheduler import DeadlineExceeded, RequestScheduler  # noqa: E402
+
+
+def test_acquire_gives_up_at_the_deadline():
+    scheduler = RequestScheduler(host_rate=0.1, host_burst=1, respect_robots=False)
+    scheduler.acquire("https://example.com/")
+    started = time.monotonic()
+    with pytest.raises(DeadlineExceeded):
+        scheduler.acquire("https://example.com/contact", deadline=started + 0.3)
+    assert time.monotonic() - started < 2
+    assert not scheduler._waiting
+
+
+def test_acquire_is_granted_before_the_deadline():
+    scheduler = RequestScheduler(host_rate=100, host_burst=1, respect_robots=False)
+    scheduler.acquire("https://example.com/")
+    scheduler.acquire("https://example.com/contact", deadline=time.monotonic() + 5)
+
+
+def test_robots_fetch_gets_the_deadline_and_a_timeout_is_not_remembered():
+    calls = []
+
+    def robots_fetch(url, deadline=None):
+        calls.append(deadline)
+        raise DeadlineExceeded("out of time")
+
+    scheduler = RequestScheduler(robots_fetch=robots_fetch)
+    deadline = time.monotonic() + 1
+    with pytest.raises(DeadlineExceeded):
+        scheduler.check_robots("https://example.com/contact", deadline)
+    with pytest.raises(DeadlineExceeded):
+        scheduler.check_robots("https://example.com/about", deadline)
+    assert calls == [deadline, deadline]
+
+
+def test_page_is_skipped_when_the_robots_fetch_finds_the_host_dead(tmp_path, monkeypatch):
+    import http_client
+    import resolver
+
+    monkeypatch.setattr(resolver, "DEAD_AFTER_FAILURES", {"nxdomain": 1, "refused": 1, "timeout": 1})
+    monkeypatch.setattr(http_client, "_scheduler", RequestScheduler(robots_fetch=http_client.get_robots))
+    monkeypatch.setattr(http_client, "_resolver", resolver.Resolver(path=str(tmp_path / "dead.sqlite")))
+    with pytest.raises(resolver.HostDead):
+        http_client.get_page("http://127.0.0.1:1/", deadline=time.monotonic() + 5)
+    assert http_client.dead_host_count() == 1
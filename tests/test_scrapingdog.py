@@ -0,0 +1,43 @@
+import os
+import socket
+import sys
+import threading
+
+import requests
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from scheduler import RobotsDisallowed  # noqa: E402
+from scrapingdog import was_not_sent  # noqa: E402
+
+
+def request_error(url):
+    try:
+        requests.get(url, timeout=(2, 2))
+    except requests.exceptions.RequestException as e:
+        return e
+    raise AssertionError(f"{url} answered")
+
+
+def test_refused_connection_and_robots_were_not_sent():
+    assert was_not_sent(request_error("http://127.0.0.1:1/"))
+    assert was_not_sent(RobotsDisallowed("robots.txt disallows it"))
+
+
+def test_connection_dropped_after_the_request_was_sent_is_charged():
+    listener = socket.socket()
+    listener.bind(("127.0.0.1", 0))
+    listener.listen()
+
+    def read_then_drop():
+        conn, _ = listener.accept()
+        conn.recv(1024)
+        conn.close()
+
+    threading.Thread(target=read_then_drop, daemon=True).start()
+    try:
+        error = request_error(f"http://127.0.0.1:{listener.getsockname()[1]}/")
+    finally:
+        listener.close()
+    assert isinstance(error, requests.exceptions.ConnectionError)
+    assert not was_not_sent(error)
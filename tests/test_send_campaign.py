@@ -0,0 +1,67 @@
+import functools
+import os
+import smtplib
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+import email_campaign  # noqa: E402
+from fake_smtp import FakeSMTPServer  # noqa: E402
+from outbox import Outbox  # noqa: E402
+from send_pipeline import SendLimiter, SendPipeline  # noqa: E402
+from smtp_pool import SMTPPool  # noqa: E402
+
+
+def queued_outbox(folder, count=20):
+    outbox = Outbox(os.path.join(folder, "outbox.sqlite"))
+    outbox.enqueue("c1", ({'recipient_email': f"lead{i}@example.com", 'company_name': f"Company {i}",
+                           'email_body': "Hello"} for i in range(count)))
+    return outbox
+
+
+def test_bad_credentials_leave_the_campaign_queued(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    outbox = queued_outbox(str(tmp_path))
+    with FakeSMTPServer(accept_login=False) as server:
+        monkeypatch.setattr(email_campaign, "SMTPPool",
+                            functools.partial(SMTPPool, host="127.0.0.1", port=server.port, starttls=False))
+        email_campaign.send_bulk_emails(outbox, "c1", "me@example.com", "wrong", rate=1000)
+        assert server.logins == 1
+        assert server.messages == 0
+    assert outbox.counts("c1")["queued"] == 20
+    assert outbox.counts("c1")["failed"] == 0
+    assert len(list(outbox.pending("c1"))) == 20
+
+
+def test_session_error_mid_run_stops_and_requeues(tmp_path):
+    outbox = queued_outbox(str(tmp_path))
+    sent = []
+
+    def send(message):
+        outbox.mark_sending(message)
+        if len(sent) == 3:
+            raise smtplib.SMTPAuthenticationError(535, b"5.7.8 Authentication credentials invalid")
+        sent.append(message)
+
+    limiter = SendLimiter("me@example.com", rate=1000, burst=1000, path=str(tmp_path / "quota.sqlite"))
+    pipeline = SendPipeline(send, limiter, outbox.mark_sent, workers=1, on_failed=outbox.mark_failed,
+                            on_unsent=outbox.mark_queued)
+    stats = pipeline.run(outbox.pending("c1"))
+    limiter.close()
+    assert stats.sent == 3
+    assert stats.failed == 0
+    assert "SMTPAuthenticationError" in stats.stopped
+    assert outbox.counts("c1") == {"queued": 17, "sending": 0, "sent": 3, "failed": 0}
+
+
+def test_requeue_failed_by_error(tmp_path):
+    outbox = queued_outbox(str(tmp_path), count=3)
+    messages = list(outbox.pending("c1"))
+    outbox.mark_failed(messages[0], "(550, b'No such user')")
+    outbox.mark_failed(messages[1], "(535, b'Authentication failed')")
+    outbox.mark_failed(messages[2], "(535, b'Authentication failed')")
+    assert outbox.failed_errors("c1") == [("(535, b'Authentication failed')", 2), ("(550, b'No such user')", 1)]
+    assert outbox.requeue("c1", ["(535, b'Authentication failed')"]) == 2
+    assert outbox.counts("c1")["queued"] == 2
+    assert outbox.requeue("c1") == 1
+    assert outbox.counts("c1")["failed"] == 0
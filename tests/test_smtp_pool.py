@@ -0,0 +1,41 @@
+import os
+import smtplib
+import sys
+from email.message import EmailMessage
+
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Scripts"))
+
+from fake_smtp import FakeSMTPServer  # noqa: E402
+from smtp_pool import SMTPPool  # noqa: E402
+
+
+def message(recipient):
+    msg = EmailMessage()
+    msg["From"] = "me@example.com"
+    msg["To"] = recipient
+    msg["Subject"] = "Hello"
+    msg.set_content("Hi")
+    return msg
+
+
+def test_bad_credentials_fail_once_on_enter():
+    with FakeSMTPServer(accept_login=False) as server:
+        pool = SMTPPool("me@example.com", "wrong", host="127.0.0.1", port=server.port, starttls=False)
+        with pytest.raises(smtplib.SMTPAuthenticationError):
+            pool.__enter__()
+        for i in range(5):
+            with pytest.raises(smtplib.SMTPAuthenticationError):
+                pool.send(message(f"lead{i}@example.com"))
+        assert server.logins == 1
+
+
+def test_messages_reuse_the_connection_opened_on_enter():
+    with FakeSMTPServer() as server:
+        with SMTPPool("me@example.com", "secret", host="127.0.0.1", port=server.port, size=1,
+                      starttls=False) as pool:
+            for i in range(3):
+                pool.send(message(f"lead{i}@example.com"))
+        assert server.logins == 1
+        assert server.messages == 3